@@ -3,11 +3,11 @@ Reasoning Kernel for The Planner's Assistant
 Provides streaming reasoning with module-aware security.
 """
 import os
+import re
 import sys
-import json
 import asyncio
+import threading
 from uuid import uuid4
-from datetime import datetime
 from pathlib import Path
 from typing import AsyncGenerator, Dict, Any, List, Optional
 
@@ -15,23 +15,66 @@ from typing import AsyncGenerator, Dict, Any, List, Optional
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(REPO_ROOT))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 from modules.context import ContextPack, ReasonRequest
 from modules.playbook import execute_playbook
-from modules.trace import TraceEntry, write_trace
+from modules.trace import TraceEntry, write_trace, start_writer, flush_traces
+
+import orjson
+
+def _coerce(o):
+    """Last-resort encoder hook for values orjson doesn't know natively.
+
+    Cheaper than recursively sanitizing every payload up front: the hook
+    only fires for the rare pydantic model or set that slips into an
+    event, so the hot token path pays nothing.
+    """
+    if isinstance(o, BaseModel):
+        return o.model_dump()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    return str(o)
+
+def _dumps(obj) -> str:
+    """Serialize SSE payloads with orjson (Rust, SIMD string escaping)."""
+    return orjson.dumps(obj, default=_coerce, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+# ORJSONResponse: plain-JSON endpoints get the same Rust encoder the
+# SSE stream already uses
+app = FastAPI(title="TPA Reasoning Kernel", default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+async def _start_trace_writer():
+    start_writer()
+
+@app.on_event("startup")
+async def _load_lexeme_filter():
+    from modules import lexeme_filter
+    # Load off the loop; searches run without the pre-check until ready
+    asyncio.create_task(asyncio.to_thread(lexeme_filter.refresh))
 
-app = FastAPI(title="TPA Reasoning Kernel")
+@app.on_event("shutdown")
+async def _flush_trace_writer():
+    from modules import llm, proxy_client
+    import db
+    await llm.close_session()
+    await proxy_client.close_session()
+    await flush_traces()
+    db.close_pool()
 
 # CORS for frontend
-# CORS: allow all localhost/127.0.0.1 origins for dev
-import re
+# CORS: allow all localhost/127.0.0.1 origins for dev.
+# Precompiled and anchored so the per-request match is a single cached
+# pattern and a longer evil-suffix origin cannot slip past a prefix match.
+_ORIGIN_RE = re.compile(r"^http://(localhost|127\.0\.0\.1):\d+$")
 app.add_middleware(
     CORSMiddleware,
-    allow_origin_regex=r"http://(localhost|127\.0\.0\.1):\d+",
+    allow_origin_regex=_ORIGIN_RE,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -70,7 +113,7 @@ async def reason(req: ReasonRequest):
                 log_security_event("rate_limit_exceeded", client_id, {"module": req.module}, "warning")
                 yield {
                     "event": "error",
-                    "data": json.dumps({"message": "Rate limit exceeded. Please try again later."})
+                    "data": _dumps({"message": "Rate limit exceeded. Please try again later."})
                 }
                 return
             
@@ -89,7 +132,7 @@ async def reason(req: ReasonRequest):
                 log_security_event("input_validation_failed", client_id, {"error": str(e)}, "warning")
                 yield {
                     "event": "error",
-                    "data": json.dumps({"message": f"Invalid input: {e}"})
+                    "data": _dumps({"message": f"Invalid input: {e}"})
                 }
                 return
             
@@ -105,7 +148,6 @@ async def reason(req: ReasonRequest):
             
             # Log start
             await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
                 step="init",
                 module=req.module,
                 input={"prompt": req.prompt[:100], "session_id": session_id}
@@ -115,12 +157,11 @@ async def reason(req: ReasonRequest):
             async for event in execute_playbook(context, trace_path):
                 yield {
                     "event": event["type"],
-                    "data": json.dumps(event["data"])
+                    "data": _dumps(event["data"])
                 }
             
             # Log completion
             await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
                 step="complete",
                 module=req.module
             ))
@@ -129,37 +170,69 @@ async def reason(req: ReasonRequest):
             log_security_event("reasoning_error", session_id, {"error": str(e)}, "error")
             yield {
                 "event": "error",
-                "data": json.dumps({"message": str(e)})
+                "data": _dumps({"message": str(e)})
             }
     
     return EventSourceResponse(event_generator())
 
-# Service endpoints (called by playbook tools)
-from services import policy, docs, spatial, precedent, standards, feedback, classify
-from services import retriever as retriever_service
-from services import synthesise as synthesise_service
-from services import map_overlays as map_overlays_service
-from services import files as files_service
-from services import ingest as ingest_service
-from services import actions as actions_service
-from services import evidence as evidence_service
-
-app.include_router(policy.router, prefix="/services/policy", tags=["policy"])
-app.include_router(docs.router, prefix="/services/docs", tags=["docs"])
-app.include_router(spatial.router, prefix="/services/spatial", tags=["spatial"])
-app.include_router(precedent.router, prefix="/services/precedent", tags=["precedent"])
-app.include_router(standards.router, prefix="/services/standards", tags=["standards"])
-app.include_router(feedback.router, prefix="/services/feedback", tags=["feedback"])
-app.include_router(classify.router, prefix="/services", tags=["classify"])
-app.include_router(files_service.router, prefix="/services/files", tags=["files"])
-app.include_router(ingest_service.router, prefix="/services/ingest", tags=["ingest"])
-app.include_router(actions_service.router, prefix="/services", tags=["actions"])
-app.include_router(evidence_service.router, prefix="/evidence", tags=["evidence"])
-
-# New Planner-pattern endpoints
-app.include_router(retriever_service.router, tags=["retrieval"])
-app.include_router(synthesise_service.router, tags=["synthesis"])
-app.include_router(map_overlays_service.router, tags=["map"])
+# Service endpoints (called by playbook tools).
+# Imported on the first request that needs them: the service modules pull
+# in psycopg, shapely, pyproj, sentence-transformers etc., so deferring
+# them past startup lets the server bind (and /status, /reason work)
+# immediately instead of blocking on the heavy imports.
+_SERVICES_LOADED = False
+_services_lock = threading.Lock()
+
+# Paths served by the lazily attached routers; anything else never pays
+# the import check beyond one startswith call.
+_SERVICE_PREFIXES = (
+    "/services/", "/evidence", "/retrieve", "/synthesise", "/explain",
+    "/map-overlays",
+)
+
+def _load_service_routers() -> None:
+    global _SERVICES_LOADED
+    with _services_lock:
+        if _SERVICES_LOADED:
+            return
+        _do_load_service_routers()
+        _SERVICES_LOADED = True
+
+def _do_load_service_routers() -> None:
+    from services import policy, docs, spatial, precedent, standards, feedback, classify
+    from services import retriever as retriever_service
+    from services import synthesise as synthesise_service
+    from services import map_overlays as map_overlays_service
+    from services import files as files_service
+    from services import ingest as ingest_service
+    from services import actions as actions_service
+    from services import evidence as evidence_service
+
+    app.include_router(policy.router, prefix="/services/policy", tags=["policy"])
+    app.include_router(docs.router, prefix="/services/docs", tags=["docs"])
+    app.include_router(spatial.router, prefix="/services/spatial", tags=["spatial"])
+    app.include_router(precedent.router, prefix="/services/precedent", tags=["precedent"])
+    app.include_router(standards.router, prefix="/services/standards", tags=["standards"])
+    app.include_router(feedback.router, prefix="/services/feedback", tags=["feedback"])
+    app.include_router(classify.router, prefix="/services", tags=["classify"])
+    app.include_router(files_service.router, prefix="/services/files", tags=["files"])
+    app.include_router(ingest_service.router, prefix="/services/ingest", tags=["ingest"])
+    app.include_router(actions_service.router, prefix="/services", tags=["actions"])
+    app.include_router(evidence_service.router, prefix="/evidence", tags=["evidence"])
+
+    # New Planner-pattern endpoints
+    app.include_router(retriever_service.router, tags=["retrieval"])
+    app.include_router(synthesise_service.router, tags=["synthesis"])
+    app.include_router(map_overlays_service.router, tags=["map"])
+
+@app.middleware("http")
+async def _lazy_service_routes(request: Request, call_next):
+    # Attach the service routers on the first request that targets them;
+    # the import runs on a worker thread so concurrent /reason streams
+    # aren't stalled, and the lock makes racing first requests safe.
+    if not _SERVICES_LOADED and request.url.path.startswith(_SERVICE_PREFIXES):
+        await asyncio.to_thread(_load_service_routers)
+    return await call_next(request)
 
 if __name__ == "__main__":
     import uvicorn
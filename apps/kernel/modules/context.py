@@ -1,8 +1,11 @@
 """Context and request models for reasoning kernel."""
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class ReasonRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     module: Literal["evidence", "policy", "strategy", "vision", "feedback", "dm"]
     prompt: str
     site_data: Optional[Dict[str, Any]] = None
@@ -12,8 +15,13 @@ class ReasonRequest(BaseModel):
     # When true, kernel suggests actions and does NOT auto-execute them
     interactive_actions: bool = True
 
-class ContextPack(BaseModel):
-    """Context bundle for reasoning."""
+@dataclass(slots=True)
+class ContextPack:
+    """Context bundle for reasoning.
+
+    Internal type: fields are copied from an already-validated ReasonRequest,
+    so a plain dataclass avoids re-running validation per request.
+    """
     module: str
     prompt: str
     site_data: Optional[Dict[str, Any]] = None
@@ -21,11 +29,22 @@ class ContextPack(BaseModel):
     run_mode: str = "stable"
     allow_web_fetch: bool = False
     interactive_actions: bool = True
-    
+    # Per-request memo for DB searches shared across panels (see
+    # panel_dispatcher._cached); never serialized.
+    _memo: Dict[Any, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Normalize once at ingress so downstream code can .get()
+        # without isinstance guards.
+        if not isinstance(self.site_data, dict):
+            self.site_data = {}
+        if not isinstance(self.proposal_data, dict):
+            self.proposal_data = {}
+
     def get_tool_budget(self) -> int:
         """Get tool call budget based on run mode."""
         return 5 if self.run_mode == "stable" else 15
-    
+
     def get_web_fetch_limit(self) -> int:
         """Get web fetch limit based on run mode."""
         if not self.allow_web_fetch:
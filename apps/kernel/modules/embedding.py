@@ -2,37 +2,269 @@
 Falls back gracefully if model is unavailable.
 """
 from __future__ import annotations
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional
+import hashlib
 import os
-import asyncio
 
 _MODEL = None
 _MODEL_NAME = os.getenv("EMBED_MODEL", "qwen3-embedding:8b")
 _DIM_TARGET = int(os.getenv("EMBED_DIM", "1024"))
 _EMBED_PROVIDER = os.getenv("LLM_PROVIDER", "ollama").lower()
 _OLLAMA_BASE = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+# Token hash for the deterministic fallback embedding. Cryptographic
+# strength is not needed here, only speed and distribution, so prefer
+# SIMD-accelerated BLAKE3 when installed.
+try:
+    from blake3 import blake3 as _token_hash
+    _HAS_BLAKE3 = True
+except Exception:
+    from hashlib import sha256 as _token_hash
+    _HAS_BLAKE3 = False
+
+# Two-tier embedding cache: bounded in-process LRU over an optional on-disk
+# LMDB store. Vectors are kept as float16 bytes (2KB each at 1024 dims).
+_VEC_CACHE_MAX = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+_vec_cache_mem: "OrderedDict[bytes, bytes]" = OrderedDict()
+_LMDB_ENV = None
+_LMDB_PATH = os.getenv("EMBED_CACHE_PATH", "./logs/embed_cache.lmdb")
+
+
+def _cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _lmdb_env():
+    """Open the on-disk cache lazily; disabled if lmdb is unavailable."""
+    global _LMDB_ENV
+    if _LMDB_ENV is None:
+        try:
+            import lmdb
+            from pathlib import Path
+            Path(_LMDB_PATH).parent.mkdir(parents=True, exist_ok=True)
+            _LMDB_ENV = lmdb.open(_LMDB_PATH, map_size=1 << 30)
+        except Exception:
+            _LMDB_ENV = False
+    return _LMDB_ENV or None
+
+
+def _cache_get(key: bytes) -> Optional[List[float]]:
+    import numpy as np
+    buf = _vec_cache_mem.get(key)
+    if buf is not None:
+        _vec_cache_mem.move_to_end(key)
+        return np.frombuffer(buf, dtype=np.float16).astype(np.float32).tolist()
+    env = _lmdb_env()
+    if env is not None:
+        try:
+            with env.begin() as txn:
+                buf = txn.get(key)
+            if buf is not None:
+                _cache_put_mem(key, bytes(buf))
+                return np.frombuffer(buf, dtype=np.float16).astype(np.float32).tolist()
+        except Exception:
+            pass
+    return None
+
+
+def _cache_put_mem(key: bytes, buf: bytes) -> None:
+    _vec_cache_mem[key] = buf
+    _vec_cache_mem.move_to_end(key)
+    while len(_vec_cache_mem) > _VEC_CACHE_MAX:
+        _vec_cache_mem.popitem(last=False)
+
+
+def _cache_put(key: bytes, vec: List[float]) -> None:
+    import numpy as np
+    buf = np.asarray(vec, dtype=np.float16).tobytes()
+    _cache_put_mem(key, buf)
+    env = _lmdb_env()
+    if env is not None:
+        try:
+            with env.begin(write=True) as txn:
+                txn.put(key, buf)
+        except Exception:
+            pass
+
+
+# Persistent HTTP clients for the Ollama embeddings endpoint (keep-alive
+# connections; created once, reused across calls)
+_HTTP = None
+_AHTTP = None
+
+
+def _http_client():
+    global _HTTP
+    if _HTTP is None:
+        import httpx
+        _HTTP = httpx.Client(base_url=_OLLAMA_BASE, timeout=httpx.Timeout(30.0, connect=3.0))
+    return _HTTP
+
+
+def _async_http_client():
+    global _AHTTP
+    if _AHTTP is None:
+        import httpx
+        _AHTTP = httpx.AsyncClient(base_url=_OLLAMA_BASE, timeout=httpx.Timeout(30.0, connect=3.0))
+    return _AHTTP
+
+
+# Optional ONNX-exported encoder (directory with model.onnx + tokenizer.json,
+# e.g. produced by `optimum-cli export onnx --optimize O3`)
+_ONNX_MODEL = None
+_ONNX_PATH = os.getenv("EMBED_ONNX_PATH", "")
+
+
+class _OnnxEncoder:
+    """Minimal SBERT-compatible encoder running under onnxruntime.
+
+    Tokenizes with the Rust fast tokenizer, runs the exported transformer,
+    then mean-pools and L2-normalizes in NumPy. Exposes the same
+    encode(texts, ...) shape as SentenceTransformer so callers don't care
+    which backend they got.
+    """
+
+    def __init__(self, model_dir: str):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        self._session = ort.InferenceSession(
+            os.path.join(model_dir, "model.onnx"),
+            providers=["CPUExecutionProvider"],
+        )
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_padding()
+        self._tokenizer.enable_truncation(max_length=512)
+
+    def encode(self, texts, batch_size: int = 64, normalize_embeddings: bool = True,
+               convert_to_numpy: bool = True, **_kwargs):
+        import numpy as np
+        outs = []
+        for start in range(0, len(texts), batch_size):
+            batch = self._tokenizer.encode_batch(texts[start:start + batch_size])
+            ids = np.array([e.ids for e in batch], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+            feed = {"input_ids": ids, "attention_mask": mask}
+            if any(i.name == "token_type_ids" for i in self._session.get_inputs()):
+                feed["token_type_ids"] = np.zeros_like(ids)
+            hidden = self._session.run(None, feed)[0]
+            # Mean pooling over non-padding tokens
+            m = mask[:, :, None].astype(hidden.dtype)
+            pooled = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outs.append(pooled)
+        return np.concatenate(outs, axis=0)
+
+
+def _load_onnx_model():
+    """Load the ONNX Runtime encoder if configured; None otherwise."""
+    global _ONNX_MODEL
+    if _ONNX_MODEL is not None:
+        return _ONNX_MODEL
+    if not _ONNX_PATH:
+        return None
+    try:
+        _ONNX_MODEL = _OnnxEncoder(_ONNX_PATH)
+    except Exception:
+        _ONNX_MODEL = None
+    return _ONNX_MODEL
 
 
 def _load_model():
-    """Load sentence-transformers model (fallback only)."""
+    """Load the local encoder: ONNX Runtime if configured, else sentence-transformers."""
     global _MODEL
+    onnx = _load_onnx_model()
+    if onnx is not None:
+        return onnx
     if _MODEL is not None:
         return _MODEL
     try:
         from sentence_transformers import SentenceTransformer
         _MODEL = SentenceTransformer(_MODEL_NAME)
+        if os.getenv("EMBED_FAST", "0") == "1":
+            _MODEL = _tune_model(_MODEL)
     except Exception as e:
         _MODEL = None
     return _MODEL
 
 
-def _pad_or_truncate(vec: List[float], dim: int) -> List[float]:
-    if len(vec) == dim:
-        return vec
-    if len(vec) > dim:
-        return vec[:dim]
-    # pad with zeros
-    return vec + [0.0] * (dim - len(vec))
+def _tune_model(model):
+    """Opt-in (EMBED_FAST=1) inference tuning: FP16 on GPU, pinned thread
+    count and torch.compile on CPU. Best-effort; returns the model unchanged
+    if anything fails."""
+    try:
+        import torch
+        torch.set_num_threads(int(os.getenv("TORCH_THREADS", str(os.cpu_count() or 1))))
+        if torch.cuda.is_available():
+            model = model.half()
+        first = model._first_module()
+        first.auto_model = torch.compile(first.auto_model, mode="reduce-overhead")
+    except Exception as e:
+        print(f"[Embedding] EMBED_FAST tuning failed: {e}")
+    return model
+
+
+def _pad_or_truncate(vec, dim: int) -> List[float]:
+    """Pad or truncate a vector (list or ndarray) to dim, in NumPy.
+
+    Conversion to list[float] happens exactly once here, at the boundary.
+    """
+    import numpy as np
+    arr = np.asarray(vec, dtype=np.float32)
+    n = arr.shape[0]
+    if n > dim:
+        arr = arr[:dim]
+    elif n < dim:
+        out = np.zeros(dim, dtype=np.float32)
+        out[:n] = arr
+        arr = out
+    return arr.tolist()
+
+
+def embed_many(texts: List[str], batch_size: int = 64) -> List[List[float]]:
+    """Embed a list of texts in one batched model call.
+
+    Texts are sorted by length before encoding ("smart batching") so each
+    batch pads to its own longest member rather than the global longest,
+    then results are restored to the caller's order. Falls back to
+    per-text get_embedding when the sentence-transformers model is
+    unavailable.
+    """
+    if not texts:
+        return []
+    keys = [_cache_key(t) for t in texts]
+    out: List[Optional[List[float]]] = [_cache_get(k) for k in keys]
+    miss = [i for i, v in enumerate(out) if v is None]
+    if not miss:
+        return out  # type: ignore[return-value]
+    model = _load_model()
+    if model is None:
+        for i in miss:
+            out[i] = get_embedding(texts[i])
+        return out  # type: ignore[return-value]
+    try:
+        import numpy as np
+        order = sorted(miss, key=lambda i: len(texts[i]))
+        vecs = model.encode(
+            [texts[i] for i in order],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        # Pad/truncate the whole 2D array in one shot
+        dim = vecs.shape[1]
+        if dim > _DIM_TARGET:
+            vecs = vecs[:, :_DIM_TARGET]
+        elif dim < _DIM_TARGET:
+            vecs = np.pad(vecs, ((0, 0), (0, _DIM_TARGET - dim)))
+        for pos, i in enumerate(order):
+            out[i] = vecs[pos].tolist()
+            _cache_put(keys[i], out[i])
+        return out  # type: ignore[return-value]
+    except Exception:
+        for i in miss:
+            out[i] = get_embedding(texts[i])
+        return out  # type: ignore[return-value]
 
 
 def get_embedding(text: str) -> List[float]:
@@ -44,60 +276,84 @@ def get_embedding(text: str) -> List[float]:
     - Deterministic hash-based fallback if both fail
     """
     
-    # Try Ollama first if configured
+    key = _cache_key(text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    # Try Ollama first if configured, over a persistent keep-alive client
     if _EMBED_PROVIDER == "ollama":
         try:
-            import aiohttp
-            import json
-            
-            # Ollama embeddings endpoint
-            url = f"{_OLLAMA_BASE}/api/embeddings"
-            payload = {"model": _MODEL_NAME, "prompt": text}
-            
-            # Run async request in sync context
-            loop = None
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            async def _fetch():
-                timeout = aiohttp.ClientTimeout(total=30, connect=3)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.post(url, json=payload) as resp:
-                        resp.raise_for_status()
-                        data = await resp.json()
-                        return data.get("embedding", [])
-            
-            vec = loop.run_until_complete(_fetch())
+            resp = _http_client().post("/api/embeddings", json={"model": _MODEL_NAME, "prompt": text})
+            resp.raise_for_status()
+            vec = resp.json().get("embedding", [])
             if vec:
-                return _pad_or_truncate(vec, _DIM_TARGET)
+                vec = _pad_or_truncate(vec, _DIM_TARGET)
+                _cache_put(key, vec)
+                return vec
         except Exception as e:
             print(f"[Embedding] Ollama embedding failed: {e}, falling back")
             pass
-    
-    # Try sentence-transformers
+
+    vec = _local_embedding(text)
+    _cache_put(key, vec)
+    return vec
+
+
+async def aget_embedding(text: str) -> List[float]:
+    """Async variant of get_embedding for callers already inside the event loop."""
+    key = _cache_key(text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    if _EMBED_PROVIDER == "ollama":
+        try:
+            resp = await _async_http_client().post(
+                "/api/embeddings", json={"model": _MODEL_NAME, "prompt": text}
+            )
+            resp.raise_for_status()
+            vec = resp.json().get("embedding", [])
+            if vec:
+                vec = _pad_or_truncate(vec, _DIM_TARGET)
+                _cache_put(key, vec)
+                return vec
+        except Exception as e:
+            print(f"[Embedding] Ollama embedding failed: {e}, falling back")
+            pass
+    vec = _local_embedding(text)
+    _cache_put(key, vec)
+    return vec
+
+
+def _local_embedding(text: str) -> List[float]:
+    """Local fallback chain: sentence-transformers, then deterministic hashing."""
     model = _load_model()
     if model is not None:
         try:
-            vec = model.encode([text], normalize_embeddings=True)[0].tolist()
+            vec = model.encode([text], normalize_embeddings=True, convert_to_numpy=True)[0]
             return _pad_or_truncate(vec, _DIM_TARGET)
         except Exception:
             pass
     
-    # Final fallback: deterministic hash-based embedding
-    import hashlib
-    import math
+    # Final fallback: deterministic hash-based embedding.
+    # With BLAKE3's extendable output the whole text is hashed once and the
+    # vector read straight out of the digest — no per-token loop at all.
+    import numpy as np
+    if _HAS_BLAKE3:
+        h = _token_hash(text.lower().encode()).digest(length=_DIM_TARGET * 4)
+        out = np.frombuffer(h, dtype=np.uint32).astype(np.float32) / 4294967296.0 - 0.5
+        out /= (np.linalg.norm(out) or 1.0)
+        return out.tolist()
     tokens = text.lower().split()
-    out = [0.0] * _DIM_TARGET
+    out = np.zeros(_DIM_TARGET, dtype=np.float32)
     for tok in tokens:
-        h = hashlib.sha256(tok.encode()).digest()
-        for i in range(0, len(h), 4):
-            idx = (h[i] + h[i+1]) % _DIM_TARGET
-            val = int.from_bytes(h[i:i+4], 'little') / (2**32 - 1)
-            out[idx] += (val - 0.5)
+        h = _token_hash(tok.encode()).digest()
+        # Vectorized scatter-add: 8 uint32 words per digest instead of a
+        # Python-level loop over 4-byte slices.
+        arr = np.frombuffer(h, dtype=np.uint32)
+        idx = ((arr & 0xFF) + ((arr >> 8) & 0xFF)) % _DIM_TARGET
+        val = arr.astype(np.float32) / 4294967295.0 - 0.5
+        np.add.at(out, idx, val)
     # L2 normalize
-    norm = math.sqrt(sum(v*v for v in out)) or 1.0
-    out = [v / norm for v in out]
-    return out
+    out /= (np.linalg.norm(out) or 1.0)
+    return out.tolist()
@@ -1,188 +1,371 @@
 """
 Evidence Base Module - handles evidence discovery, validation, and analysis
 """
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import AsyncGenerator, List, Dict, Any
+from collections import Counter
+from datetime import datetime, timezone
 from modules.context import ContextPack
-from modules.trace import TraceEntry, write_trace
+from modules.trace import TraceEntry, write_trace_nowait
 from pathlib import Path
-import json
+import asyncio
+import time
 
-async def evidence_playbook(context: ContextPack, trace_path: Path) -> List[Dict[str, Any]]:
-    """
-    Execute evidence base reasoning workflow.
-    
-    Phases:
-    1. Parse intent (search, validate, link, gap analysis)
-    2. Retrieve evidence items
-    3. Analyze quality and currency
-    4. Generate intents for UI panels
+import numpy as np
+
+# Keyword tables for intent/topic detection, hoisted to module scope so the
+# hot path allocates nothing per request. Compiled once into an
+# Aho-Corasick automaton so each prompt is scanned in a single pass;
+# falls back to plain substring scans if pyahocorasick is unavailable.
+_ACTION_KEYWORDS = {
+    "search": ("search", "find", "show", "list"),
+    "gap_analysis": ("gap", "missing", "weak", "stale"),
+    "dependencies": ("link", "connect", "dependency", "depends"),
+    "validate": ("validate", "check", "quality", "currency"),
+}
+_TOPIC_KEYWORDS = {
+    "housing": ("housing",),
+    "transport": ("transport",),
+    "economy": ("economy", "employment"),
+    "climate": ("environment", "climate"),
+}
+# Local authorities the demo evidence base covers
+_AUTHORITY_KEYWORDS = {
+    "Westminster": ("westminster",),
+    "Camden": ("camden",),
+    "Hackney": ("hackney",),
+    "Islington": ("islington",),
+    "Southwark": ("southwark",),
+    "Lambeth": ("lambeth",),
+    "Tower Hamlets": ("tower hamlets",),
+}
+# Evidence document types (matching seeded `evidence.type` values)
+_TYPE_KEYWORDS = {
+    "SHMA": ("shma", "housing market assessment"),
+    "SFRA": ("sfra", "flood risk assessment"),
+    "Transport Assessment": ("transport assessment", "transport study"),
+    "Viability Study": ("viability",),
+    "SHELAA": ("shelaa", "land availability"),
+    "Heritage Assessment": ("heritage assessment", "heritage study"),
+}
+# Branch priority mirrors the original if/elif chain
+_ACTION_PRIORITY = ("search", "gap_analysis", "dependencies", "validate")
+_TOPIC_ORDER = ("housing", "transport", "economy", "climate")
+_CATEGORIES = (
+    ("action", _ACTION_KEYWORDS),
+    ("topic", _TOPIC_KEYWORDS),
+    ("authority", _AUTHORITY_KEYWORDS),
+    ("type", _TYPE_KEYWORDS),
+)
+
+try:
+    import ahocorasick
+    _AC = ahocorasick.Automaton()
+    for _bucket, _table in _CATEGORIES:
+        for _label, _kws in _table.items():
+            for _kw in _kws:
+                _AC.add_word(_kw, (_bucket, _label))
+    _AC.make_automaton()
+except Exception:
+    _AC = None
+
+
+def _intent_evt(panel: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a show_panel intent with a consistent key order.
+
+    Panel ids come from time.time_ns() — one integer read instead of a
+    datetime round-trip per panel, and unique within a session.
     """
-    intents = []
-    
-    await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
-        step="evidence_start",
-        input={"prompt": context.prompt}
-    ))
-    
-    # Determine user intent
-    prompt_lower = context.prompt.lower()
-    
-    # Phase 1: Determine action type
-    if any(kw in prompt_lower for kw in ["search", "find", "show", "list"]):
-        action = "search"
-    elif any(kw in prompt_lower for kw in ["gap", "missing", "weak", "stale"]):
-        action = "gap_analysis"
-    elif any(kw in prompt_lower for kw in ["link", "connect", "dependency", "depends"]):
-        action = "dependencies"
-    elif any(kw in prompt_lower for kw in ["validate", "check", "quality", "currency"]):
-        action = "validate"
+    return {
+        "type": "intent",
+        "data": {
+            "action": "show_panel",
+            "panel": panel,
+            "id": f"{panel}_{time.time_ns()}",
+            "data": data,
+        },
+    }
+
+
+def _token_evt(content: str) -> Dict[str, Any]:
+    return {"type": "token", "data": {"content": content}}
+
+
+# Items are appended to an already-shown panel in small batches so the
+# frontend paints the first rows before the full result set is serialized.
+_ITEM_BATCH = 5
+
+
+def _append_evt(panel: str, panel_id: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """append_panel_items: the translator turns each item into an add op
+    on the panel's data.items array."""
+    return {
+        "type": "intent",
+        "data": {
+            "action": "append_panel_items",
+            "panel": panel,
+            "id": panel_id,
+            "data": {"items": items},
+        },
+    }
+
+
+def _merge_evt(panel: str, panel_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """merge_panel_data: per-key replace ops, so a summary-only update
+    can't clobber the items already streamed into the panel."""
+    return {
+        "type": "intent",
+        "data": {
+            "action": "merge_panel_data",
+            "panel": panel,
+            "id": panel_id,
+            "data": data,
+        },
+    }
+
+
+async def _gaps_cached() -> Dict[str, Any]:
+    """evidence_gaps() with a short TTL cache (the query is keyless)."""
+    from services.evidence import evidence_gaps
+    from services.evidence_cache import evidence_cache
+    cached = evidence_cache.get_gaps()
+    if cached is not None:
+        return cached
+    gaps = await evidence_gaps()
+    evidence_cache.put_gaps(gaps)
+    return gaps
+
+
+# Below this size the plain Python scan beats the array round-trip
+_VECTORIZE_MIN = 64
+
+
+def _summarise_items(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate a result set in one pass each via Counter (C-level loops)."""
+    if not items:
+        return {"by_type": {}, "by_authority": {}, "stale_count": 0}
+    types, auths, years = zip(*((i["type"], i["geographic_scope"], i["year"]) for i in items))
+    current_year = datetime.now(timezone.utc).year
+    if len(items) >= _VECTORIZE_MIN:
+        # One vectorized pass; -1 marks missing years and fails the mask
+        yrs = np.fromiter((y or -1 for y in years), dtype=np.int16, count=len(years))
+        stale_count = int(((yrs > 0) & (current_year - yrs > 5)).sum())
     else:
-        action = "search"  # default
-    
-    await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
-        step="determine_action",
-        output={"action": action}
-    ))
-    
-    # Phase 2: Execute action
-    if action == "search":
-        # Extract search parameters
-        topics = []
-        if "housing" in prompt_lower:
-            topics.append("housing")
-        if "transport" in prompt_lower:
-            topics.append("transport")
-        if "economy" in prompt_lower or "employment" in prompt_lower:
-            topics.append("economy")
-        if "environment" in prompt_lower or "climate" in prompt_lower:
-            topics.append("climate")
-        
-        # Call backend service to get actual evidence items
-        from services.evidence import search_evidence, EvidenceSearchRequest
+        stale_count = sum(1 for y in years if y and current_year - y > 5)
+    return {
+        "by_type": dict(Counter(types).most_common(5)),
+        "by_authority": dict(Counter(a for a in auths if a).most_common(5)),
+        "stale_count": stale_count,
+    }
+
+
+def _scan_prompt(prompt_lower: str) -> Dict[str, set]:
+    """Single automaton pass over the prompt; returns labels hit per category."""
+    buckets: Dict[str, set] = {bucket: set() for bucket, _ in _CATEGORIES}
+    if _AC is not None:
+        for _end, (bucket, label) in _AC.iter(prompt_lower):
+            buckets[bucket].add(label)
+    else:
+        for bucket, table in _CATEGORIES:
+            for label, kws in table.items():
+                if any(kw in prompt_lower for kw in kws):
+                    buckets[bucket].add(label)
+    return buckets
+
+
+async def _do_search(context: ContextPack, buckets: Dict[str, set], prompt_lower: str,
+                     trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
+    """Search action: show the browser shell, then stream matching items."""
+    # Extract search parameters (all found by the same scan)
+    topics = [t for t in _TOPIC_ORDER if t in buckets["topic"]]
+    authorities = sorted(buckets["authority"])
+    evidence_types = sorted(buckets["type"])
+
+    # Show the browser shell immediately; items stream in below.
+    shell = _intent_evt("evidence_browser", {
+        "items": [],
+        "filters": {
+            "topics": topics,
+            "authorities": authorities,
+            "types": evidence_types,
+            "scope": "db"
+        }
+    })
+    panel_id = shell["data"]["id"]
+    yield shell
+
+    # Call backend service to get actual evidence items. Repeated and
+    # near-duplicate prompts are served from the evidence cache without
+    # touching the embedding model or the database.
+    from services.evidence import search_evidence, EvidenceSearchRequest
+    from services.evidence_cache import evidence_cache
+    cache_key = (prompt_lower, tuple(topics), tuple(authorities), tuple(evidence_types), "db")
+    items = evidence_cache.get(cache_key)
+    if items is None:
+        embedding = None
+        try:
+            from modules.embedding import aget_embedding
+            embedding = await aget_embedding(context.prompt)
+            items = evidence_cache.get(cache_key, embedding)
+        except Exception:
+            pass
+    if items is None:
         try:
             results = await search_evidence(EvidenceSearchRequest(
                 q=context.prompt,
                 topic=topics if topics else None,
+                type=evidence_types[0] if evidence_types else None,
                 scope="db"
             ))
-            items = [item.dict() for item in results]
+            items = [item.model_dump() for item in results]
+            evidence_cache.put(cache_key, items, embedding)
         except Exception as e:
-            await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
+            write_trace_nowait(trace_path, TraceEntry(
                 step="evidence_search_error",
                 output={"error": str(e)}
             ))
             items = []
-        
-        # Emit search intent with actual data
-        intents.append({
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_browser",
-                "id": f"evidence_browser_{int(datetime.utcnow().timestamp())}",
-                "data": {
-                    "items": items,
-                    "filters": {
-                        "topics": topics,
-                        "scope": "db"
-                    }
-                }
-            }
-        })
-        
-        await write_trace(trace_path, TraceEntry(
-            t=datetime.utcnow().isoformat(),
-            step="evidence_search",
-            output={"topics": topics}
+
+    # Stream items into the shown panel in small batches
+    for i in range(0, len(items), _ITEM_BATCH):
+        yield _append_evt("evidence_browser", panel_id, items[i:i + _ITEM_BATCH])
+    yield _merge_evt("evidence_browser", panel_id, {"summary": _summarise_items(items)})
+
+    write_trace_nowait(trace_path, TraceEntry(
+        step="evidence_search",
+        output={"topics": topics}
+    ))
+
+
+async def _do_gap_analysis(context: ContextPack, buckets: Dict[str, set], prompt_lower: str,
+                           trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
+    """Gap-analysis action: emit the gaps panel."""
+    yield _intent_evt("evidence_gaps", {
+        "no_evidence": [],
+        "stale_evidence": [],
+        "weak_links_only": []
+    })
+
+    write_trace_nowait(trace_path, TraceEntry(
+        step="gap_analysis",
+        output={}
+    ))
+
+
+async def _do_dependencies(context: ContextPack, buckets: Dict[str, set], prompt_lower: str,
+                           trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
+    """Dependencies action: emit the dependency graph panel."""
+    yield _intent_evt("dependency_graph", {
+        "nodes": [],
+        "edges": []
+    })
+
+    write_trace_nowait(trace_path, TraceEntry(
+        step="dependency_graph",
+        output={}
+    ))
+
+
+async def _do_validate(context: ContextPack, buckets: Dict[str, set], prompt_lower: str,
+                       trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
+    """Validate action: show both shells, then fill them.
+
+    The two backend calls are independent, so overlap their latency
+    instead of awaiting them in sequence.
+    """
+    browser_shell = _intent_evt("evidence_browser", {"items": [], "filters": {}})
+    browser_id = browser_shell["data"]["id"]
+    yield browser_shell
+
+    from services.evidence import search_evidence, EvidenceSearchRequest
+    results, gaps = await asyncio.gather(
+        search_evidence(EvidenceSearchRequest(q=context.prompt, scope="db")),
+        _gaps_cached(),
+        return_exceptions=True,
+    )
+    if isinstance(results, BaseException):
+        write_trace_nowait(trace_path, TraceEntry(
+            step="evidence_search_error",
+            output={"error": str(results)}
         ))
-    
-    elif action == "gap_analysis":
-        # Emit gap analysis panel
-        intents.append({
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_gaps",
-                "id": f"evidence_gaps_{int(datetime.utcnow().timestamp())}",
-                "data": {
-                    "no_evidence": [],
-                    "stale_evidence": [],
-                    "weak_links_only": []
-                }
-            }
-        })
-        
-        await write_trace(trace_path, TraceEntry(
-            t=datetime.utcnow().isoformat(),
-            step="gap_analysis",
-            output={}
+        items = []
+    else:
+        items = [item.model_dump() for item in results]
+    if isinstance(gaps, BaseException):
+        write_trace_nowait(trace_path, TraceEntry(
+            step="evidence_gaps_error",
+            output={"error": str(gaps)}
         ))
+        gaps = {"no_evidence": [], "stale_evidence": [], "weak_links_only": []}
+
+    for i in range(0, len(items), _ITEM_BATCH):
+        yield _append_evt("evidence_browser", browser_id, items[i:i + _ITEM_BATCH])
+    yield _merge_evt("evidence_browser", browser_id, {"summary": _summarise_items(items)})
+    yield _intent_evt("evidence_gaps", {
+        "no_evidence": gaps.get("no_evidence", []),
+        "stale_evidence": gaps.get("stale_evidence", []),
+        "weak_links_only": gaps.get("weak_links_only", [])
+    })
+
+
+# O(1) dispatch; each handler is an independently testable generator
+_ACTION_HANDLERS = {
+    "search": _do_search,
+    "gap_analysis": _do_gap_analysis,
+    "dependencies": _do_dependencies,
+    "validate": _do_validate,
+}
+
+
+async def evidence_playbook(context: ContextPack, trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Execute evidence base reasoning workflow.
     
-    elif action == "dependencies":
-        # Emit dependency graph
-        intents.append({
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "dependency_graph",
-                "id": f"dependency_graph_{int(datetime.utcnow().timestamp())}",
-                "data": {
-                    "nodes": [],
-                    "edges": []
-                }
-            }
-        })
-        
-        await write_trace(trace_path, TraceEntry(
-            t=datetime.utcnow().isoformat(),
-            step="dependency_graph",
-            output={}
-        ))
+    Phases:
+    1. Parse intent (search, validate, link, gap analysis)
+    2. Retrieve evidence items
+    3. Analyze quality and currency
+    4. Generate intents for UI panels
+
+    Yields events as they are produced: panel shells go out before the
+    backend calls resolve, and result items are appended in small batches.
+    """
+    emitted = 0
+
+    # Lowercase and slice the prompt once; the scan and every trace entry
+    # reuse these instead of re-deriving them.
+    prompt_lower = context.prompt.lower()
+    prompt_snippet = context.prompt[:100]
+
+    write_trace_nowait(trace_path, TraceEntry(
+        step="evidence_start",
+        input={"prompt": prompt_snippet}
+    ))
+
+    # Phase 1: Determine action type (one automaton pass over the prompt)
+    buckets = _scan_prompt(prompt_lower)
+    action = next((a for a in _ACTION_PRIORITY if a in buckets["action"]), "search")
+    
+    write_trace_nowait(trace_path, TraceEntry(
+        step="determine_action",
+        output={"action": action}
+    ))
     
-    elif action == "validate":
-        # Emit both search and gaps
-        intents.append({
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_browser",
-                "id": f"evidence_browser_{int(datetime.utcnow().timestamp())}",
-                "data": {"items": [], "filters": {}}
-            }
-        })
-        intents.append({
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_gaps",
-                "id": f"evidence_gaps_{int(datetime.utcnow().timestamp())}",
-                "data": {
-                    "no_evidence": [],
-                    "stale_evidence": [],
-                    "weak_links_only": []
-                }
-            }
-        })
+    # Phase 2: Execute action
+    handler = _ACTION_HANDLERS.get(action, _do_search)
+    async for evt in handler(context, buckets, prompt_lower, trace_path):
+        yield evt
+        emitted += 1
     
     # Final summary message
-    intents.append({
-        "type": "token",
-        "data": {"content": f"\n\nEvidence base analysis complete. Action: {action}"}
-    })
+    yield _token_evt(f"\n\nEvidence base analysis complete. Action: {action}")
     
-    intents.append({
+    yield {
         "type": "final",
         "data": {"summary": f"Evidence {action} executed", "action": action}
-    })
+    }
+    emitted += 2
     
-    await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
+    write_trace_nowait(trace_path, TraceEntry(
         step="evidence_complete",
-        output={"intents_count": len(intents)}
+        output={"intents_count": emitted}
     ))
-    
-    return intents
@@ -0,0 +1,112 @@
+"""Bloom filter over the fulltext lexemes of policy_para and precedent.
+
+Prompts often contain terms that never appear in either tsv column
+(site addresses, applicant names), yet each such miss still pays an
+embedding plus a tsquery round trip. At startup we enumerate the
+distinct lexemes via ts_stat and load them into a Bloom filter so the
+search functions can short-circuit to [] when no query token can
+possibly match.
+
+The filter is a plain bytearray with k indexes derived from two base
+hashes (Kirsch-Mitzenmacher double hashing). ts_stat reports *stemmed*
+lexemes ("housing" -> "hous"), so probe tokens are run through the same
+Snowball English stemmer Postgres's 'english' config uses before
+lookup. False positives just mean the query runs as before; the filter
+can never suppress a real hit. Until the load completes (or if it
+fails, or snowballstemmer is not installed) lookups report "possibly
+present", so searches degrade to their normal path.
+"""
+import hashlib
+import math
+import threading
+from typing import Iterable, List, Optional
+
+from db import get_conn
+
+# Same algorithm as to_tsvector('english', ...): stemming the probe
+# tokens with it makes them line up with the ts_stat lexemes exactly.
+# Without it a raw token like "policies" would miss the stored "polici"
+# and the pre-check would wrongly rule out real matches, so the filter
+# stays disabled rather than risk false negatives.
+try:
+    import snowballstemmer
+    _STEMMER = snowballstemmer.stemmer("english")
+except Exception:
+    _STEMMER = None
+
+_CAPACITY = 100_000        # expected distinct lexemes
+_ERROR_RATE = 0.001        # acceptable false-positive rate
+
+_LEXEME_SQL = """
+    SELECT word FROM ts_stat('SELECT tsv FROM policy_para')
+    UNION
+    SELECT word FROM ts_stat('SELECT tsv FROM precedent')
+"""
+
+
+class _Bloom:
+    """Fixed-size Bloom filter with double-hashed probe indexes."""
+
+    __slots__ = ("_bits", "_m", "_k")
+
+    def __init__(self, capacity: int, error_rate: float):
+        # Standard sizing: m = -n ln(p) / (ln 2)^2, k = (m/n) ln 2
+        m = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._m = max(m, 8)
+        self._k = max(int(round((self._m / capacity) * math.log(2))), 1)
+        self._bits = bytearray((self._m + 7) // 8)
+
+    def _indexes(self, token: str) -> Iterable[int]:
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self._m
+        return ((h1 + i * h2) % m for i in range(self._k))
+
+    def add(self, token: str) -> None:
+        for idx in self._indexes(token):
+            self._bits[idx >> 3] |= 1 << (idx & 7)
+
+    def __contains__(self, token: str) -> bool:
+        return all(self._bits[idx >> 3] & (1 << (idx & 7))
+                   for idx in self._indexes(token))
+
+
+_bloom: Optional[_Bloom] = None
+_lock = threading.Lock()
+
+
+def refresh() -> None:
+    """(Re)build the filter from the current tsv columns.
+
+    Called in the background at startup and again after policy ingest.
+    On any failure the previous filter (or none) stays in place and
+    searches simply skip the pre-check.
+    """
+    global _bloom
+    if _STEMMER is None:
+        print("[LexemeFilter] snowballstemmer not installed; pre-check disabled")
+        return
+    try:
+        bloom = _Bloom(_CAPACITY, _ERROR_RATE)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_LEXEME_SQL)
+                for (word,) in cur.fetchall():
+                    bloom.add(word)
+        with _lock:
+            _bloom = bloom
+    except Exception as e:
+        print(f"[LexemeFilter] lexeme load failed ({e}); pre-check disabled")
+
+
+def might_match(tokens: List[str]) -> bool:
+    """True unless the filter is loaded and rules out every token.
+
+    Tokens are stemmed before probing so inflected query words match
+    the stemmed lexemes the filter was built from.
+    """
+    bloom = _bloom
+    if bloom is None or _STEMMER is None or not tokens:
+        return True
+    return any(t in bloom for t in _STEMMER.stemWords(tokens))
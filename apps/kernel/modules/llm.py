@@ -7,11 +7,15 @@ from __future__ import annotations
 
 import os
 import asyncio
-import json
 import base64
-from typing import AsyncGenerator, Optional
+from pathlib import Path
+from types import MappingProxyType
+from typing import AsyncGenerator, Optional, Union
 
 import aiohttp
+import orjson
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
 
 
 OLLAMA_BASE = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
@@ -21,8 +25,45 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama").lower()
 # Emergency bypass for testing when Ollama is stuck
 DISABLE_LLM = os.getenv("DISABLE_LLM", "false").lower() == "true"
 
+# One pooled session shared across all LLM calls: per-call sessions pay
+# TCP handshake and connector setup on every request. Short connection
+# timeout to fail fast if Ollama isn't running; per-call total timeouts
+# are passed at request time.
+_CONNECT_TIMEOUT = aiohttp.ClientTimeout(connect=3)
+_GENERATE_TIMEOUT = aiohttp.ClientTimeout(total=180, connect=3)
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=3)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+# Fallback/bypass text is emitted in chunks of ~16 tokens: fewer SSE
+# frames to flush, and no artificial 10ms-per-token sleep.
+_FALLBACK_CHUNK = 16
+
+# Bound between the Ollama reader and the SSE consumer: when the client
+# can't keep up, the producer blocks on put() instead of letting
+# aiohttp's buffer grow without limit.
+_STREAM_QUEUE_MAX = 256
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared ClientSession, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=_CONNECT_TIMEOUT,
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60),
+        )
+    return _session
 
-async def _ollama_stream_generate(prompt: str, model: Optional[str] = None) -> AsyncGenerator[str, None]:
+
+async def close_session() -> None:
+    """Close the shared session (called on app shutdown)."""
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+async def _ollama_stream_generate(prompt: str, model: Optional[str] = None,
+                                   system: Optional[str] = None) -> AsyncGenerator[str, None]:
     """Stream tokens from Ollama /api/generate. Yields partial text segments."""
     m = model or TEXT_MODEL
     url = f"{OLLAMA_BASE}/api/generate"
@@ -32,27 +73,38 @@ async def _ollama_stream_generate(prompt: str, model: Optional[str] = None) -> A
         "stream": True,
         # Keep defaults for now; users can tune via model params if needed
     }
-    # Short connection timeout to fail fast if Ollama isn't running
-    # Longer total timeout for generation
-    timeout = aiohttp.ClientTimeout(total=120, connect=3)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.post(url, json=payload) as resp:
-            resp.raise_for_status()
-            async for raw in resp.content:
+    if system:
+        # Proper role separation; lets the server reuse the cached
+        # system-prompt prefix across requests
+        payload["system"] = system
+    session = await _get_session()
+    async with session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS,
+                            timeout=_STREAM_TIMEOUT) as resp:
+        resp.raise_for_status()
+        # Read exactly one NDJSON record per iteration so a JSON line
+        # straddling a TCP segment is never fed to the decoder in pieces.
+        # orjson parses the raw bytes directly — no intermediate str.
+        while True:
+            raw = await resp.content.readline()
+            if not raw or not raw.strip():
                 if not raw:
-                    continue
-                # Ollama streams JSON lines
-                try:
-                    data = json.loads(raw.decode("utf-8"))
-                except Exception:
-                    continue
-                chunk = data.get("response")
-                if chunk:
-                    yield chunk
-
-
-async def stream_text(prompt: str) -> AsyncGenerator[str, None]:
-    """Provider-agnostic streaming for text reasoning. Currently Ollama-focused."""
+                    break
+                continue
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                continue
+            chunk = data.get("response")
+            if chunk:
+                yield chunk
+
+
+async def stream_text(prompt: str, system: Optional[str] = None) -> AsyncGenerator[str, None]:
+    """Provider-agnostic streaming for text reasoning. Currently Ollama-focused.
+
+    system, when given, is passed as the provider's system role rather
+    than stitched into the prompt string.
+    """
     # Emergency bypass
     if DISABLE_LLM:
         text = (
@@ -61,21 +113,43 @@ async def stream_text(prompt: str) -> AsyncGenerator[str, None]:
             f"**Module request:** {prompt[:200]}...\n\n"
             "The reasoning flow, panel emission, and citations should still function.\n"
         )
-        for token in text.split():
-            yield token + " "
-            await asyncio.sleep(0.01)
+        # No upstream to throttle — emit in chunks without sleeping
+        tokens = text.split()
+        for i in range(0, len(tokens), _FALLBACK_CHUNK):
+            yield " ".join(tokens[i:i + _FALLBACK_CHUNK]) + " "
         return
     
     provider = LLM_PROVIDER
     if provider == "ollama":
+        # Producer/consumer split with a bounded queue: the reader pauses
+        # when the queue fills rather than buffering the whole generation.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_MAX)
+
+        async def _produce() -> None:
+            try:
+                async for piece in _ollama_stream_generate(prompt, TEXT_MODEL, system):
+                    await queue.put(piece)
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        producer = asyncio.create_task(_produce())
+        error: Optional[Exception] = None
         try:
-            async for piece in _ollama_stream_generate(prompt, TEXT_MODEL):
-                yield piece
-            return
-        except Exception as e:
-            # Log error and fall through to template fallback
-            print(f"[LLM] Ollama streaming failed: {e}")
-            pass
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    error = item
+                    break
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+        # Log error and fall through to template fallback
+        print(f"[LLM] Ollama streaming failed: {error}")
 
     # Fallback: yield template text demonstrating reasoning structure
     text = (
@@ -88,81 +162,153 @@ async def stream_text(prompt: str) -> AsyncGenerator[str, None]:
         "2. Pull model: `ollama pull gpt-oss:20b`\n"
         "3. Restart kernel\n"
     )
-    for token in text.split():
-        yield token + " "
-        await asyncio.sleep(0.01)
+    tokens = text.split()
+    for i in range(0, len(tokens), _FALLBACK_CHUNK):
+        yield " ".join(tokens[i:i + _FALLBACK_CHUNK]) + " "
+        # Yield to the loop between chunks without adding idle time
+        await asyncio.sleep(0)
 
 
 async def generate_text(prompt: str, model: Optional[str] = None) -> str:
-    """Non-streamed text generation via Ollama (or fallback)."""
+    """Non-streamed text generation via Ollama (or fallback).
+
+    Repeated prompts are served from the prompt cache without a prefill;
+    near-duplicate prompts match on embedding similarity.
+    """
     provider = LLM_PROVIDER
     if provider == "ollama":
         m = model or TEXT_MODEL
+        from modules import llm_cache
+        cached = llm_cache.get(m, prompt)
+        if cached is not None:
+            return cached
+        embedding = None
+        try:
+            from modules.embedding import aget_embedding
+            embedding = await aget_embedding(prompt)
+            cached = llm_cache.get_semantic(embedding)
+            if cached is not None:
+                return cached
+        except Exception:
+            pass
         url = f"{OLLAMA_BASE}/api/generate"
         payload = {"model": m, "prompt": prompt, "stream": False}
-        timeout = aiohttp.ClientTimeout(total=180, connect=3)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    return data.get("response", "")
+            session = await _get_session()
+            async with session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS,
+                                    timeout=_GENERATE_TIMEOUT) as resp:
+                resp.raise_for_status()
+                data = await resp.json()
+                text = data.get("response", "")
+                if text:
+                    llm_cache.put(m, prompt, text, embedding)
+                return text
         except Exception as e:
             print(f"[LLM] Ollama generation failed: {e}")
             pass
     # Fallback
     return "⚠️ LLM service unavailable. Start Ollama with: ollama serve"
 
-async def analyze_image(image_bytes: bytes, prompt: Optional[str] = None) -> str:
-    """Analyze an image using the configured VLM model on Ollama.
-    Returns a single consolidated string response.
+# Above this size, base64-encode off the event loop: a 5 MB image costs
+# a full-buffer copy plus CPU encode that would otherwise stall streaming.
+_B64_INLINE_MAX = 256 * 1024
+
+
+async def _encode_image(image: Union[bytes, str, Path]) -> str:
+    """Base64-encode an image given as bytes or a file path.
+
+    File reads and large encodes run on a worker thread so the event
+    loop stays responsive.
+    """
+    if isinstance(image, (str, Path)):
+        return await asyncio.to_thread(
+            lambda: base64.b64encode(Path(image).read_bytes()).decode("ascii")
+        )
+    if len(image) > _B64_INLINE_MAX:
+        return await asyncio.to_thread(lambda: base64.b64encode(image).decode("ascii"))
+    return base64.b64encode(image).decode("ascii")
+
+
+async def analyze_image_stream(image: Union[bytes, str, Path], prompt: Optional[str] = None) -> AsyncGenerator[str, None]:
+    """Stream VLM analysis tokens for an image as they are generated.
+
+    Streaming consumers (e.g. the vision panel) get first tokens at
+    time-to-first-token instead of waiting for the full generation.
     """
     if LLM_PROVIDER != "ollama":
-        return "VLM not configured; set LLM_PROVIDER=ollama and OLLAMA_BASE_URL."
+        yield "VLM not configured; set LLM_PROVIDER=ollama and OLLAMA_BASE_URL."
+        return
 
     url = f"{OLLAMA_BASE}/api/generate"
-    b64 = base64.b64encode(image_bytes).decode("ascii")
+    b64 = await _encode_image(image)
     final_prompt = prompt or "Describe the image and identify planning-relevant features (mass, height, materials, context)."
     payload = {
         "model": VLM_MODEL,
         "prompt": final_prompt,
         "images": [b64],
-        "stream": False,
+        "stream": True,
     }
-    timeout = aiohttp.ClientTimeout(total=120, connect=3)
+    session = await _get_session()
+    async with session.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS,
+                            timeout=_STREAM_TIMEOUT) as resp:
+        resp.raise_for_status()
+        while True:
+            raw = await resp.content.readline()
+            if not raw or not raw.strip():
+                if not raw:
+                    break
+                continue
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                continue
+            chunk = data.get("response")
+            if chunk:
+                yield chunk
+
+
+async def analyze_image(image: Union[bytes, str, Path], prompt: Optional[str] = None) -> str:
+    """Analyze an image using the configured VLM model on Ollama.
+
+    Accepts raw bytes or a local file path. Thin accumulator over
+    analyze_image_stream for callers that want one consolidated string.
+    """
     try:
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                # Non-streaming returns a single object with 'response'
-                return data.get("response", "")
+        return "".join([piece async for piece in analyze_image_stream(image, prompt)])
     except Exception as e:
         return f"⚠️ VLM analysis failed: {e}. Ensure Ollama is running with model {VLM_MODEL}"
 
 
-def build_system_prompt(module: str) -> str:
-    """Return a compact system prompt tailored to the module."""
-    base = (
-        "You are The Planner's Assistant. Provide concise, grounded reasoning. "
-        "Prefer bullet points. Avoid hallucinating citations."
-    )
-    mod_lines = {
+_SYSTEM_PROMPT_BASE = (
+    "You are The Planner's Assistant. Provide concise, grounded reasoning. "
+    "Prefer bullet points. Avoid hallucinating citations."
+)
+
+# Per-module prompts are fixed strings, so concatenate once at import
+# and serve by lookup; MappingProxyType marks the table read-only.
+SYSTEM_PROMPTS = MappingProxyType({
+    module: _SYSTEM_PROMPT_BASE + "\n" + line
+    for module, line in {
         "dm": "Focus on material considerations, applicable policies, and a balanced recommendation.",
         "policy": "Review drafting clarity, consistency, and cross-references.",
         "strategy": "Compare options, trade-offs, and delivery implications.",
         "vision": "Discuss design and visual impacts in plain language.",
         "feedback": "Cluster themes and summarize sentiments.",
         "evidence": "Summarize constraints and relevant evidence sources.",
-    }
-    return base + "\n" + mod_lines.get(module, "")
+    }.items()
+})
+
+
+def build_system_prompt(module: str) -> str:
+    """Return a compact system prompt tailored to the module."""
+    return SYSTEM_PROMPTS.get(module, _SYSTEM_PROMPT_BASE)
 
 
 def build_user_prompt(module: str, user_text: str, site: Optional[dict] = None, proposal: Optional[dict] = None) -> str:
     parts = [f"Module: {module}", f"Question: {user_text}"]
     if site:
-        parts.append(f"Site: {json.dumps(site)}")
+        parts.append(f"Site: {orjson.dumps(site).decode()}")
     if proposal:
-        parts.append(f"Proposal: {json.dumps(proposal)}")
+        parts.append(f"Proposal: {orjson.dumps(proposal).decode()}")
     parts.append("Respond step-by-step with a short rationale then actionable outputs.")
     return "\n".join(parts)
@@ -0,0 +1,124 @@
+"""Prompt/completion cache for non-streamed LLM calls.
+
+The planner and other generate_text callers send highly templated
+prompts (same system text, same panel registry, small variations in the
+user query), so repeats are common. Two tiers:
+
+1. Exact: sha256(model + prompt) -> completion, in-memory LRU backed by
+   a small sqlite table so repeats survive restarts.
+2. Semantic: cosine similarity over recent prompt embeddings, so a
+   near-duplicate phrasing reuses a prior completion without a prefill.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MAX_ENTRIES = 1024     # in-memory LRU bound
+_MAX_VECTORS = 256      # semantic-tier rolling window
+_SIM_THRESHOLD = 0.95   # cosine similarity to reuse a completion
+_TTL = 3600.0           # seconds a cached completion stays valid
+
+_DB_PATH = Path(os.getenv("LLM_CACHE_PATH", "./logs/llm_cache.sqlite"))
+
+_mem: "OrderedDict[str, tuple]" = OrderedDict()
+_vectors: List[Any] = []
+_vector_keys: List[str] = []
+_db: Optional[sqlite3.Connection] = None
+_db_failed = False
+
+
+def _key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\x00{prompt}".encode()).hexdigest()
+
+
+def _get_db() -> Optional[sqlite3.Connection]:
+    global _db, _db_failed
+    if _db is None and not _db_failed:
+        try:
+            _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _db = sqlite3.connect(str(_DB_PATH), check_same_thread=False)
+            _db.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, response TEXT, created REAL)"
+            )
+            _db.commit()
+        except Exception as e:
+            print(f"[LLMCache] sqlite unavailable ({e}); memory-only")
+            _db_failed = True
+    return _db
+
+
+def get(model: str, prompt: str) -> Optional[str]:
+    """Exact-match lookup: memory first, then the sqlite table."""
+    key = _key(model, prompt)
+    hit = _mem.get(key)
+    if hit is not None:
+        ts, response = hit
+        if time.time() - ts < _TTL:
+            _mem.move_to_end(key)
+            return response
+        del _mem[key]
+    db = _get_db()
+    if db is not None:
+        try:
+            row = db.execute(
+                "SELECT response, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and time.time() - row[1] < _TTL:
+                _mem[key] = (row[1], row[0])
+                return row[0]
+        except Exception:
+            pass
+    return None
+
+
+def get_semantic(embedding: List[float]) -> Optional[str]:
+    """Return a completion whose prompt embedding is a near-duplicate."""
+    if np is None or not _vectors:
+        return None
+    q = np.asarray(embedding, dtype=np.float32)
+    q /= (np.linalg.norm(q) or 1.0)
+    sims = np.stack(_vectors) @ q
+    best = int(np.argmax(sims))
+    if sims[best] >= _SIM_THRESHOLD:
+        hit = _mem.get(_vector_keys[best])
+        if hit is not None and time.time() - hit[0] < _TTL:
+            return hit[1]
+    return None
+
+
+def put(model: str, prompt: str, response: str, embedding: Optional[List[float]] = None) -> None:
+    """Store a completion; optionally register the prompt embedding."""
+    key = _key(model, prompt)
+    now = time.time()
+    _mem[key] = (now, response)
+    _mem.move_to_end(key)
+    while len(_mem) > _MAX_ENTRIES:
+        _mem.popitem(last=False)
+    db = _get_db()
+    if db is not None:
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created) VALUES (?, ?, ?)",
+                (key, response, now),
+            )
+            db.commit()
+        except Exception:
+            pass
+    if embedding is not None and np is not None:
+        v = np.asarray(embedding, dtype=np.float32)
+        v /= (np.linalg.norm(v) or 1.0)
+        _vectors.append(v)
+        _vector_keys.append(key)
+        if len(_vectors) > _MAX_VECTORS:
+            _vectors.pop(0)
+            _vector_keys.pop(0)
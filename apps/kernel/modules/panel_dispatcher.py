@@ -1,226 +1,278 @@
 """Panel dispatcher - executes data retrieval and emission for planned panels.
 
 Takes a panel plan (list of panel names) and generates the data payload
-for each panel by calling the appropriate DB/service functions.
+for each panel by calling the appropriate DB/service functions. Each
+panel has its own handler coroutine registered in PANEL_HANDLERS, so
+dispatch is a single dict lookup instead of a string-compare ladder.
 """
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional
 import asyncio
 from modules.context import ContextPack
-from db import get_conn
 
-# Import search functions (will be defined in same file as playbook currently uses)
-# We'll refactor these to be importable
+# The playbook module imports this one at its top, so its search
+# functions can't be imported here at module scope without a cycle.
+# Bind them once on first dispatch instead of re-importing per call.
+_pb = None
+
+
+def _playbook():
+    global _pb
+    if _pb is None:
+        from modules import playbook as _playbook_mod
+        _pb = _playbook_mod
+    return _pb
+
+
+def _retrieve_exc(fut: "asyncio.Future") -> None:
+    # Warmed futures may never be awaited if their panel isn't planned;
+    # touching the exception keeps asyncio from logging it as unretrieved.
+    if not fut.cancelled():
+        fut.exception()
+
+
+def warm_query(context: ContextPack, fn, *args) -> None:
+    """Start a memoized DB query now, without awaiting it.
+
+    Lets the playbook kick off the hot lookups while web retrieval and
+    planning are still in flight; _cached finds the same future later.
+    """
+    key = (fn.__name__, args)
+    if key not in context._memo:
+        fut = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        fut.add_done_callback(_retrieve_exc)
+        context._memo[key] = fut
+
+
+async def _cached(context: ContextPack, fn, *args):
+    """Run a sync DB search on a worker thread, memoized per request.
+
+    Several panels issue identical (function, args) queries — e.g.
+    applicable_policies, planning_balance and draft_decision all search
+    policies with the same prompt and limit — so each unique query hits
+    the DB once per request.
+    """
+    key = (fn.__name__, args)
+    fut = context._memo.get(key)
+    if fut is None:
+        # Store the future, not the result, so panels dispatched
+        # concurrently share one in-flight query instead of racing.
+        fut = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        context._memo[key] = fut
+    # Shield: the planner cancels speculative panel tasks it drops, and
+    # Task.cancel() would otherwise propagate into this shared future,
+    # killing the same query for panels that were selected.
+    return await asyncio.shield(fut)
+
+
+def warm_constraints(context: ContextPack) -> None:
+    """Start the db_constraints lookup for this request without awaiting."""
+    if "db_constraints" not in context._memo:
+        pb = _playbook()
+        fut = asyncio.ensure_future(asyncio.to_thread(pb.db_constraints, context))
+        fut.add_done_callback(_retrieve_exc)
+        context._memo["db_constraints"] = fut
+
+
+async def _constraints(context: ContextPack):
+    """db_constraints for this request, on a worker thread, computed once.
+
+    Keyed by name alone (the context is the request), since ContextPack
+    isn't hashable and both map and evidence_snapshot need the same rows.
+    """
+    warm_constraints(context)
+    # Shielded for the same reason as _cached: the future is shared
+    # across panels and must survive a cancelled speculative dispatch.
+    return await asyncio.shield(context._memo["db_constraints"])
+
+
+async def _resolve_citations(citations) -> List[Dict[str, Any]]:
+    """Citations may arrive as an in-flight retrieval future.
+
+    Only the handlers that embed citations pay the wait; the rest of the
+    prefetched panels run while retrieval is still going.
+    """
+    if isinstance(citations, asyncio.Future):
+        # The retrieval future is shared across panels; shield it from
+        # cancellation of any one speculative panel task awaiting it.
+        citations = await asyncio.shield(citations)
+    return citations or []
+
+
+def _panel(panel: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "intent",
+        "data": {
+            "action": "show_panel",
+            "panel": panel,
+            "data": data,
+        }
+    }
+
+
+async def _h_applicable_policies(context, citations):
+    pb = _playbook()
+    policies = await _cached(context, pb.db_search_policies, context.prompt, 6)
+    citations = await _resolve_citations(citations)
+    return _panel("applicable_policies", {"policies": policies, "citations": citations})
+
+
+async def _h_precedents(context, citations):
+    pb = _playbook()
+    precedents = await _cached(context, pb.db_search_precedents, context.prompt, 5)
+    return _panel("precedents", {"precedents": precedents})
+
+
+async def _h_map(context, citations):
+    lat = context.site_data.get("lat")
+    lng = context.site_data.get("lng")
+
+    if lat is None or lng is None:
+        # Should have been filtered by planner, but skip if missing
+        return None
+
+    constraints = await _constraints(context)
+    return _panel("map", {
+        "center": {"lat": lat, "lng": lng},
+        "constraints": constraints,
+    })
+
+
+async def _h_evidence_snapshot(context, citations):
+    constraints = await _constraints(context) or []
+    citations = await _resolve_citations(citations)
+    return _panel("evidence_snapshot", {
+        "constraints": constraints,
+        "policy_count": len(constraints),
+        "citations": citations,
+    })
+
+
+async def _h_evidence_browser(context, citations):
+    pb = _playbook()
+    items = await asyncio.to_thread(pb.db_search_evidence, context.prompt or "", None, 50)
+    return _panel("evidence_browser", {
+        "items": items,
+        "filters": {
+            "topics": [],
+            "scope": "db"
+        }
+    })
+
+
+async def _h_planning_balance(context, citations):
+    pb = _playbook()
+    # The two queries are independent; run them on worker threads
+    policies, precedents = await asyncio.gather(
+        _cached(context, pb.db_search_policies, context.prompt, 6),
+        _cached(context, pb.db_search_precedents, context.prompt, 5),
+    )
+    balance = pb.compute_planning_balance(policies, precedents)
+    context._memo[("balance", context.prompt)] = balance
+    return _panel("planning_balance", balance)
+
+
+async def _h_draft_decision(context, citations):
+    pb = _playbook()
+    balance = context._memo.get(("balance", context.prompt))
+    if balance is None:
+        policies, precedents = await asyncio.gather(
+            _cached(context, pb.db_search_policies, context.prompt, 6),
+            _cached(context, pb.db_search_precedents, context.prompt, 5),
+        )
+        balance = pb.compute_planning_balance(policies, precedents)
+    draft = pb.compute_draft_decision(balance)
+    return _panel("draft_decision", draft)
+
+
+async def _h_policy_editor(context, citations):
+    pb = _playbook()
+    policies = await _cached(context, pb.db_search_policies, context.prompt or "policy", 1)
+    draft_text = (policies[0]["text"] if policies else "")
+    return _panel("policy_editor", {"draft_text": draft_text, "suggestions": []})
+
+
+async def _h_scenario_compare(context, citations):
+    pb = _playbook()
+    # Create two simple scenarios based on query; both searches go to
+    # Postgres in one pipelined round trip
+    p1, p2 = await asyncio.to_thread(
+        pb.db_search_policies_many,
+        [context.prompt + " option A", context.prompt + " option B"],
+        4,
+    )
+    return _panel("scenario_compare", {
+        "scenarios": [
+            {"name": "Option A", "score": len(p1)},
+            {"name": "Option B", "score": len(p2)}
+        ]
+    })
+
+
+async def _h_visual_compliance(context, citations):
+    return _panel("visual_compliance", {"compliance": []})
+
+
+async def _h_consultation_themes(context, citations):
+    pb = _playbook()
+    themes = await asyncio.to_thread(pb.compute_themes, context.prompt)
+    return _panel("consultation_themes", {"themes": themes})
+
+
+async def _h_key_issues_matrix(context, citations):
+    return _panel("key_issues_matrix", {"issues": []})
+
+
+async def _h_conflict_heatmap(context, citations):
+    return _panel("conflict_heatmap", {"conflicts": []})
+
+
+async def _h_doc_viewer(context, citations):
+    return _panel("doc_viewer", {
+        "doc_id": "unknown",
+        "title": "Document",
+        "paragraphs": []
+    })
+
+
+PANEL_HANDLERS: Dict[str, Callable] = {
+    "applicable_policies": _h_applicable_policies,
+    "precedents": _h_precedents,
+    "map": _h_map,
+    "evidence_snapshot": _h_evidence_snapshot,
+    "evidence_browser": _h_evidence_browser,
+    "planning_balance": _h_planning_balance,
+    "draft_decision": _h_draft_decision,
+    "policy_editor": _h_policy_editor,
+    "scenario_compare": _h_scenario_compare,
+    "visual_compliance": _h_visual_compliance,
+    "consultation_themes": _h_consultation_themes,
+    "key_issues_matrix": _h_key_issues_matrix,
+    "conflict_heatmap": _h_conflict_heatmap,
+    "doc_viewer": _h_doc_viewer,
+}
 
 
 async def dispatch_panel(
     panel_name: str,
     context: ContextPack,
-    citations: List[Dict[str, Any]]
+    citations: List[Dict[str, Any]],
+    prefetched: Optional[Dict[str, "asyncio.Task"]] = None,
 ) -> Dict[str, Any]:
     """Execute data retrieval for a specific panel.
-    
+
     Returns:
         Dict with panel type and data payload ready for emission.
+        If the planner speculatively dispatched this panel already,
+        the in-flight task's result is reused instead of re-querying.
     """
-    
-    if panel_name == "applicable_policies":
-        from modules.playbook import db_search_policies
-        policies = db_search_policies(context.prompt, limit=6)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "applicable_policies",
-                "data": {"policies": policies, "citations": citations},
-            }
-        }
-    
-    elif panel_name == "precedents":
-        from modules.playbook import db_search_precedents
-        precedents = db_search_precedents(context.prompt, limit=5)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "precedents",
-                "data": {"precedents": precedents},
-            }
-        }
-    
-    elif panel_name == "map":
-        from modules.playbook import db_constraints
-        lat = (context.site_data or {}).get("lat") if isinstance(context.site_data, dict) else None
-        lng = (context.site_data or {}).get("lng") if isinstance(context.site_data, dict) else None
-        
-        if lat is None or lng is None:
-            # Should have been filtered by planner, but skip if missing
-            return None
-        
-        constraints = db_constraints(context)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "map",
-                "data": {
-                    "center": {"lat": lat, "lng": lng},
-                    "constraints": constraints,
-                },
-            }
-        }
-    
-    elif panel_name == "evidence_snapshot":
-        from modules.playbook import db_constraints
-        constraints = db_constraints(context) or []
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_snapshot",
-                "data": {
-                    "constraints": constraints,
-                    "policy_count": len(constraints),
-                    "citations": citations or [],
-                }
-            }
-        }
-    
-    elif panel_name == "evidence_browser":
-        from modules.playbook import db_search_evidence
-        items = db_search_evidence(context.prompt or "", limit=50)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "evidence_browser",
-                "data": {
-                    "items": items,
-                    "filters": {
-                        "topics": [],
-                        "scope": "db"
-                    }
-                }
-            }
-        }
-    
-    elif panel_name == "planning_balance":
-        from modules.playbook import db_search_policies, db_search_precedents, compute_planning_balance
-        policies = db_search_policies(context.prompt, limit=6)
-        precedents = db_search_precedents(context.prompt, limit=5)
-        balance = compute_planning_balance(policies, precedents)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "planning_balance",
-                "data": balance,
-            }
-        }
-    
-    elif panel_name == "draft_decision":
-        from modules.playbook import db_search_policies, db_search_precedents, compute_planning_balance, compute_draft_decision
-        policies = db_search_policies(context.prompt, limit=6)
-        precedents = db_search_precedents(context.prompt, limit=5)
-        balance = compute_planning_balance(policies, precedents)
-        draft = compute_draft_decision(balance)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "draft_decision",
-                "data": draft,
-            }
-        }
-    
-    elif panel_name == "policy_editor":
-        from modules.playbook import db_search_policies
-        policies = db_search_policies(context.prompt or "policy", limit=1)
-        draft_text = (policies[0]["text"] if policies else "")
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "policy_editor",
-                "data": {"draft_text": draft_text, "suggestions": []},
-            }
-        }
-    
-    elif panel_name == "scenario_compare":
-        from modules.playbook import db_search_policies
-        # Create two simple scenarios based on query
-        p1 = db_search_policies(context.prompt + " option A", limit=4)
-        p2 = db_search_policies(context.prompt + " option B", limit=4)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "scenario_compare",
-                "data": {
-                    "scenarios": [
-                        {"name": "Option A", "score": len(p1)},
-                        {"name": "Option B", "score": len(p2)}
-                    ]
-                }
-            }
-        }
-    
-    elif panel_name == "visual_compliance":
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "visual_compliance",
-                "data": {"compliance": []}
-            }
-        }
-    
-    elif panel_name == "consultation_themes":
-        from modules.playbook import compute_themes
-        themes = compute_themes(context.prompt)
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "consultation_themes",
-                "data": {"themes": themes}
-            }
-        }
-    
-    elif panel_name == "key_issues_matrix":
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "key_issues_matrix",
-                "data": {"issues": []}
-            }
-        }
-    
-    elif panel_name == "conflict_heatmap":
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "conflict_heatmap",
-                "data": {"conflicts": []}
-            }
-        }
-    
-    elif panel_name == "doc_viewer":
-        return {
-            "type": "intent",
-            "data": {
-                "action": "show_panel",
-                "panel": "doc_viewer",
-                "data": {
-                    "doc_id": "unknown",
-                    "title": "Document",
-                    "paragraphs": []
-                }
-            }
-        }
-    
-    else:
+    if prefetched is not None:
+        task = prefetched.get(panel_name)
+        if task is not None and not task.cancelled():
+            return await task
+
+    handler = PANEL_HANDLERS.get(panel_name)
+    if handler is None:
         print(f"[Dispatcher] Unknown panel type: {panel_name}")
         return None
+    return await handler(context, citations)
@@ -5,11 +5,26 @@ to show and in what order. This replaces hardcoded module->panel mappings
 with conversational reasoning.
 """
 from __future__ import annotations
-import json
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import orjson
 from modules.context import ContextPack
 from modules import llm
 
+# First JSON array in the response, fences/prose and all
+_JSON_ARRAY_RE = re.compile(r"\[.*?\]", re.DOTALL)
+
+# Recent plans keyed by (module, prompt hash): recurring prompts skip
+# the planner LLM round trip entirely.
+_PLAN_CACHE_TTL = 300.0
+_PLAN_CACHE_MAX = 512
+_plan_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
 # Registry of available panels per module (synced with frontend)
 PANEL_REGISTRY = {
     "dm": {
@@ -53,6 +68,17 @@ PANEL_REGISTRY = {
     },
 }
 
+# PANEL_REGISTRY is immutable, so the per-module prompt sections and
+# validation sets are rendered once at import instead of per request.
+_PANEL_LIST_CACHE = {
+    module: "\n".join(f"- {name}: {desc}" for name, desc in panels.items())
+    for module, panels in PANEL_REGISTRY.items()
+}
+_VALID_PANELS = {
+    module: frozenset(panels.keys())
+    for module, panels in PANEL_REGISTRY.items()
+}
+
 # Fallback panel sequences if LLM fails
 FALLBACK_PANELS = {
     "dm": ["applicable_policies", "precedents", "planning_balance", "draft_decision"],
@@ -67,18 +93,10 @@ FALLBACK_PANELS = {
 def build_planning_prompt(context: ContextPack) -> str:
     """Build prompt for LLM panel planner."""
     module = context.module
-    available = PANEL_REGISTRY.get(module, {})
-    
-    # Format available panels
-    panel_list = "\n".join([
-        f"- {name}: {desc}"
-        for name, desc in available.items()
-    ])
+    panel_list = _PANEL_LIST_CACHE.get(module, "")
     
     # Context summary
-    has_coords = False
-    if context.site_data and isinstance(context.site_data, dict):
-        has_coords = "lat" in context.site_data and "lng" in context.site_data
+    has_coords = "lat" in context.site_data and "lng" in context.site_data
     
     prompt = f"""You are planning the UI response for a planning assistant query.
 
@@ -109,67 +127,113 @@ Do not include explanations or markdown formatting.
     return prompt
 
 
-async def plan_panels(context: ContextPack) -> List[str]:
+async def plan_panels(
+    context: ContextPack,
+    citations: Optional[Any] = None,
+) -> Tuple[List[str], Dict[str, "asyncio.Task"]]:
     """Use LLM to decide which panels to show for this query.
+
+    citations may be the resolved list or the in-flight retrieval
+    future; it is handed to the prefetched dispatches as-is and only
+    awaited by handlers that embed citations.
     
     Returns:
-        List of panel names in display order.
+        (panels, prefetched): panel names in display order, plus dispatch
+        tasks for the module's likely panels that were started while the
+        planner LLM call was in flight. The planner usually takes 1-3s,
+        so the DB work for the probable panels runs under it for free;
+        tasks for panels the plan drops are cancelled.
         Falls back to module defaults if LLM fails or returns invalid JSON.
     """
+    from modules.panel_dispatcher import dispatch_panel, _retrieve_exc
+
+    has_coords = "lat" in context.site_data and "lng" in context.site_data
+
+    # Reuse a recent plan for the same module + prompt; the panels still
+    # dispatch fresh data, only the LLM planning call is skipped. The key
+    # carries everything the plan depends on besides the prompt — coords
+    # presence gates the map panel and run_mode changes the panel budget —
+    # so the same prompt with and without site data can't share a plan.
+    cache_key = (
+        context.module,
+        context.run_mode,
+        has_coords,
+        hashlib.blake2b(context.prompt.encode(), digest_size=16).digest(),
+    )
+    hit = _plan_cache.get(cache_key)
+    if hit is not None and time.monotonic() - hit[0] < _PLAN_CACHE_TTL:
+        _plan_cache.move_to_end(cache_key)
+        print(f"[PanelPlanner] Plan cache hit: {hit[1]}")
+        return list(hit[1]), {}
+
     # Build planning prompt
     prompt = build_planning_prompt(context)
-    
+
+    # Speculatively dispatch the panels this module usually shows
+    prefetched = {
+        name: asyncio.create_task(dispatch_panel(name, context, citations or []))
+        for name in FALLBACK_PANELS.get(context.module, [])
+    }
+
     try:
         # Get LLM response (non-streaming)
         response = await llm.generate_text(prompt, model=None)
         
-        # Parse JSON
-        # Strip markdown code fences if present
+        # Parse JSON: pull the first array out of the response directly,
+        # which copes with markdown fences, trailing prose, or bare JSON
+        # without rebuilding the string.
         response = response.strip()
-        if response.startswith("```"):
-            # Extract content between fences
-            lines = response.split("\n")
-            response = "\n".join(lines[1:-1]) if len(lines) > 2 else response
-        
-        panel_plan = json.loads(response)
+        m = _JSON_ARRAY_RE.search(response)
+        panel_plan = orjson.loads(m.group(0)) if m else orjson.loads(response)
         
         if not isinstance(panel_plan, list):
             raise ValueError("LLM returned non-list")
         
         # Validate panel names against registry
-        available = set(PANEL_REGISTRY.get(context.module, {}).keys())
+        available = _VALID_PANELS.get(context.module, frozenset())
         validated = [p for p in panel_plan if p in available]
         
         if not validated:
             raise ValueError("No valid panels in LLM response")
         
         # Apply coordinate constraint for map
-        has_coords = False
-        if context.site_data and isinstance(context.site_data, dict):
-            has_coords = "lat" in context.site_data and "lng" in context.site_data
-        
         if "map" in validated and not has_coords:
             validated.remove("map")
-        
+
         # Limit to reasonable count (max 5 panels)
         validated = validated[:5]
-        
+
         print(f"[PanelPlanner] LLM selected panels: {validated}")
-        return validated
-        
+        selected = validated
+
+        # Only genuine LLM plans are cached: caching the fallback would
+        # pin the degraded plan for the full TTL after one transient
+        # LLM failure.
+        _plan_cache[cache_key] = (time.monotonic(), list(selected))
+        _plan_cache.move_to_end(cache_key)
+        while len(_plan_cache) > _PLAN_CACHE_MAX:
+            _plan_cache.popitem(last=False)
+
     except Exception as e:
         print(f"[PanelPlanner] Planning failed: {e}, using fallback")
         fallback = FALLBACK_PANELS.get(context.module, ["applicable_policies"])
-        
+
         # Apply coordinate constraint to fallback too
-        has_coords = False
-        if context.site_data and isinstance(context.site_data, dict):
-            has_coords = "lat" in context.site_data and "lng" in context.site_data
-        
         if "map" in fallback and not has_coords:
             fallback = [p for p in fallback if p != "map"]
-        
-        return fallback
+
+        selected = fallback
+
+    # Drop speculative work the plan didn't keep. A dropped dispatch may
+    # already have failed; touching its exception keeps asyncio from
+    # logging it as never retrieved.
+    for name in list(prefetched):
+        if name not in selected:
+            task = prefetched.pop(name)
+            task.cancel()
+            task.add_done_callback(_retrieve_exc)
+
+    return selected, prefetched
 
 
 def get_panel_description(module: str, panel_name: str) -> str:
@@ -4,7 +4,8 @@ Convert internal panel generation to validated patch operations
 """
 
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from types import MappingProxyType
+import time
 import sys
 sys.path.append('/home/tjm/code/demo')
 
@@ -43,20 +44,29 @@ def create_show_panel_intent(
 
 def create_patch_envelope(
     ops: List[Dict[str, Any]],
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    *,
+    validated: bool = False
 ) -> Dict[str, Any]:
     """
     Create a patch envelope with operations
+
+    Pass validated=True for ops built by this module's own constructors
+    (already schema-compliant) to skip the per-op pydantic round-trip on
+    the emit hot path; externally-sourced ops keep full validation.
     """
-    # Validate each operation
-    validated_ops = []
-    for op_dict in ops:
-        try:
-            op = PatchOperation(**op_dict)
-            validated_ops.append(op.dict(by_alias=True))
-        except Exception as e:
-            print(f"Warning: Invalid patch operation: {e}")
-            continue
+    if validated:
+        validated_ops = list(ops)
+    else:
+        # Validate each operation
+        validated_ops = []
+        for op_dict in ops:
+            try:
+                op = PatchOperation(**op_dict)
+                validated_ops.append(op.dict(by_alias=True))
+            except Exception as e:
+                print(f"Warning: Invalid patch operation: {e}")
+                continue
     
     envelope = {
         "action": "patch",
@@ -92,7 +102,7 @@ def create_add_panel_op(
         "id": panel_id,
         "type": panel_type,
         "data": data,
-        "timestamp": int(datetime.utcnow().timestamp() * 1000),
+        "timestamp": time.time_ns() // 1_000_000,
         "module": module,
     }
     
@@ -132,7 +142,9 @@ def emit_panel_as_patch(
     """
     try:
         op = create_add_panel_op(panel_type, data, module)
-        envelope = create_patch_envelope([op], session_id)
+        # create_add_panel_op already validated the panel data and emits
+        # a well-formed op, so skip re-validating it
+        envelope = create_patch_envelope([op], session_id, validated=True)
         
         return {
             "type": "patch",
@@ -156,34 +168,30 @@ def create_safe_mode_panel(
     """
     Create a safe mode notice panel
     """
+    ts = time.time_ns() // 1_000_000
     return {
         "id": "safe_mode_notice",
         "type": "safe_mode_notice",
         "data": {
             "reason": reason,
-            "timestamp": int(datetime.utcnow().timestamp() * 1000),
+            "timestamp": ts,
             "errorCount": error_count,
             "message": "The system entered safe mode due to validation errors."
         },
-        "timestamp": int(datetime.utcnow().timestamp() * 1000),
+        "timestamp": ts,
     }
 
 
-# Budget limits per run mode (should match TypeScript registry)
-BUDGET_LIMITS = {
-    "stable": {
-        "max_panels": 5,
-        "max_weight": 12,
-    },
-    "deep": {
-        "max_panels": 15,
-        "max_weight": 40,
-    }
-}
+# Budget limits per run mode as (max_panels, max_weight) tuples
+# (should match TypeScript registry); read-only by construction.
+BUDGET_LIMITS = MappingProxyType({
+    "stable": (5, 12),
+    "deep": (15, 40),
+})
 
 
 # Panel weights (should match TypeScript registry)
-PANEL_WEIGHTS = {
+PANEL_WEIGHTS = MappingProxyType({
     "applicable_policies": 2,
     "key_issues_matrix": 3,
     "precedents": 2,
@@ -197,32 +205,39 @@ PANEL_WEIGHTS = {
     "consultation_themes": 2,
     "map": 3,
     "doc_viewer": 1,
-}
+})
 
 
 class BudgetTracker:
     """Track panel budget for run mode"""
-    
+
+    __slots__ = ("run_mode", "panel_count", "total_weight", "max_panels", "max_weight")
+
+    # Bound once in the class body so the hot checks skip LOAD_GLOBAL
+    # plus method lookup on every call
+    _weight_of = PANEL_WEIGHTS.get
+
     def __init__(self, run_mode: str = "stable"):
         self.run_mode = run_mode
         self.panel_count = 0
         self.total_weight = 0
-        self.limits = BUDGET_LIMITS.get(run_mode, BUDGET_LIMITS["stable"])
-    
+        # Unpack the limits once: checks below are attribute loads, not
+        # dict lookups, and __slots__ keeps instances compact.
+        self.max_panels, self.max_weight = BUDGET_LIMITS.get(run_mode, BUDGET_LIMITS["stable"])
+
     def can_add_panel(self, panel_type: str) -> tuple[bool, Optional[str]]:
         """Check if panel can be added within budget"""
-        weight = PANEL_WEIGHTS.get(panel_type, 1)
-        
-        if self.panel_count >= self.limits["max_panels"]:
-            return False, f"Panel limit reached ({self.limits['max_panels']})"
-        
-        if self.total_weight + weight > self.limits["max_weight"]:
-            return False, f"Weight budget exceeded ({self.limits['max_weight']})"
-        
+        weight = self._weight_of(panel_type, 1)
+
+        if self.panel_count >= self.max_panels:
+            return False, f"Panel limit reached ({self.max_panels})"
+
+        if self.total_weight + weight > self.max_weight:
+            return False, f"Weight budget exceeded ({self.max_weight})"
+
         return True, None
-    
+
     def add_panel(self, panel_type: str):
         """Record panel addition"""
-        weight = PANEL_WEIGHTS.get(panel_type, 1)
         self.panel_count += 1
-        self.total_weight += weight
+        self.total_weight += self._weight_of(panel_type, 1)
@@ -1,17 +1,26 @@
 """Playbook execution - orchestrates reasoning flow using live services (DB)."""
 import asyncio
+import copy
+import functools
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from types import MappingProxyType
 from typing import AsyncGenerator, Dict, Any, List
 from pathlib import Path
-from datetime import datetime
 
 from modules.context import ContextPack
 from modules.trace import TraceEntry, write_trace
 from modules import llm
 from modules import proxy_client
 from modules.panel_planner import plan_panels
-from modules.panel_dispatcher import dispatch_panel
+from modules.panel_dispatcher import dispatch_panel, warm_query, warm_constraints
 from modules.reasoning_executor import run_auto_actions, extract_actions
-from db import get_conn
+from modules import lexeme_filter
+from modules.embedding import get_embedding
+from db import get_conn, exec_prepared, pipeline, to_vector
 
 # Module-specific allowed domains for citations
 ALLOWED_BY_MODULE = {
@@ -23,9 +32,134 @@ ALLOWED_BY_MODULE = {
     "evidence": ["gov.uk", "london.gov.uk", "planningportal.co.uk"]
 }
 
+# Cap concurrent download/extract pipelines so parallel retrieval
+# doesn't hammer the proxy
+_PROXY_FETCH_SEM = asyncio.Semaphore(8)
+
+# TTL LRU in front of the policy/precedent searches. The same prompt is
+# reused across modules within a session, so identical full-text +
+# vector searches repeat often. Searches run on worker threads, hence
+# the lock. Entries are deep-copied on both sides so callers can't
+# mutate cached rows.
+_SEARCH_CACHE_TTL = float(os.getenv("POLICY_CACHE_TTL", "300"))
+_SEARCH_CACHE_MAX = 512
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _search_cache_get(kind: str, query: str, limit: int):
+    key = (kind, query.strip().lower(), limit)
+    with _search_cache_lock:
+        hit = _search_cache.get(key)
+        if hit is None:
+            return None
+        ts, rows = hit
+        if time.monotonic() - ts >= _SEARCH_CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return copy.deepcopy(rows)
+
+
+def _search_cache_put(kind: str, query: str, limit: int, rows) -> None:
+    key = (kind, query.strip().lower(), limit)
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic(), copy.deepcopy(rows))
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > _SEARCH_CACHE_MAX:
+            _search_cache.popitem(last=False)
+
+
+def clear_search_caches() -> None:
+    """Drop all cached search results (for tests and cache tuning)."""
+    with _search_cache_lock:
+        _search_cache.clear()
+
+
+# compute_themes tokenization tables, built once at import
+_TOKEN_RE = re.compile(r"[a-zA-Z']+")
+_THEME_STOP = frozenset(
+    "a an the of in on at to for and or if is are was were be been being "
+    "with by from as this that these those it its their our your you we "
+    "they he she them his her i me my mine ours yours theirs not no".split()
+)
+_THEME_NEG = frozenset({"concern", "object", "oppose", "traffic", "noise"})
+
+
+def _content_tokens(query: str) -> List[str]:
+    """Tokens plainto_tsquery would keep: >2 chars and not stopwords.
+
+    A query of pure stopwords ("the", "of the") produces an empty
+    tsquery, so the searches skip the GIN probe entirely in that case.
+    """
+    return [t for t in _TOKEN_RE.findall(query.lower())
+            if len(t) > 2 and t not in _THEME_STOP]
+
+
+async def _fetch_citation(r: Dict[str, Any], module: str, trace_path: Path) -> Dict[str, Any]:
+    """Download + extract one search result into a citation dict (or None)."""
+    url = r.get("url")
+    if not url:
+        return None
+    dom = proxy_client.domain_from_url(url)
+    if not _domain_allowed(dom, module):
+        await write_trace(trace_path, TraceEntry(
+            step="citation_suppressed",
+            module=module,
+            input={"url": url, "domain": dom},
+            output={"reason": "domain not allowed for module"}
+        ))
+        return None
+    async with _PROXY_FETCH_SEM:
+        dl = await proxy_client.proxy_download(url)
+        cache_key = dl.get("cache_key")
+        if not cache_key:
+            return None
+        ex = await proxy_client.proxy_extract(cache_key)
+    paras = ex.get("paragraphs", [])
+    snippet = (paras[0].get("text") if paras else r.get("snippet")) or ""
+    return {
+        "title": r.get("title") or dom,
+        "url": url,
+        "domain": dom,
+        "snippet": snippet[:240],
+    }
+
+
+async def _retrieve_citations(context: ContextPack, trace_path: Path) -> List[Dict[str, Any]]:
+    """Phase-2 web retrieval: search, then fan out download/extract.
+
+    Runs as a background task so the planner LLM call can overlap it;
+    failures are traced and degrade to no citations.
+    """
+    web_limit = context.get_web_fetch_limit()
+    if web_limit <= 0:
+        return []
+    try:
+        results = await proxy_client.proxy_search(context.prompt)
+        # Run the per-URL download/extract pipelines concurrently:
+        # wall time becomes ~max RTT rather than the sum. Fetch a
+        # little past the cap since some results get filtered out.
+        fetched = await asyncio.gather(
+            *(_fetch_citation(r, context.module, trace_path)
+              for r in results[:web_limit * 2]),
+            return_exceptions=True,
+        )
+        return [c for c in fetched if c and not isinstance(c, BaseException)][:web_limit]
+    except Exception as e:
+        await write_trace(trace_path, TraceEntry(
+            step="proxy_error",
+            module=context.module,
+            error=str(e)
+        ))
+        return []
+
+
 async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGenerator[Dict[str, Any], None]:
     """Execute reasoning playbook for given module."""
-    
+    # Slice once; trace entries reuse the same snippet string.
+    prompt_snippet = context.prompt[:100]
+
     # Phase 1: Planning
     yield {
         "type": "intent",
@@ -35,58 +169,28 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
             "message": f"Initializing {context.module.upper()} module workspace..."
         }
     }
-    await asyncio.sleep(0.1)
+    # Yield to the loop without an artificial delay
+    await asyncio.sleep(0)
     
     # Phase 2: Retrieval
     await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
         step="retrieve",
         module=context.module,
-        input={"prompt": context.prompt}
+        input={"prompt": prompt_snippet}
     ))
 
-    # Try on-demand web retrieval via proxy within per-run cap
-    citations: List[Dict[str, Any]] = []
-    web_limit = context.get_web_fetch_limit()
-    if web_limit > 0:
-        try:
-            results = await proxy_client.proxy_search(context.prompt)
-            for r in results:
-                if len(citations) >= web_limit:
-                    break
-                url = r.get("url")
-                if not url:
-                    continue
-                dom = proxy_client.domain_from_url(url)
-                if not _domain_allowed(dom, context.module):
-                    await write_trace(trace_path, TraceEntry(
-                        t=datetime.utcnow().isoformat(),
-                        step="citation_suppressed",
-                        module=context.module,
-                        input={"url": url, "domain": dom},
-                        output={"reason": "domain not allowed for module"}
-                    ))
-                    continue
-                dl = await proxy_client.proxy_download(url)
-                cache_key = dl.get("cache_key")
-                if not cache_key:
-                    continue
-                ex = await proxy_client.proxy_extract(cache_key)
-                paras = ex.get("paragraphs", [])
-                snippet = (paras[0].get("text") if paras else r.get("snippet")) or ""
-                citations.append({
-                    "title": r.get("title") or dom,
-                    "url": url,
-                    "domain": dom,
-                    "snippet": snippet[:240],
-                })
-        except Exception as e:
-            await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
-                step="proxy_error",
-                module=context.module,
-                error=str(e)
-            ))
+    # Start the hot DB lookups now so they overlap the proxy round trips
+    # and LLM planning; the panel dispatcher's memo reuses these futures.
+    if context.module in ("dm", "evidence"):
+        warm_query(context, db_search_policies, context.prompt, 6)
+    if context.module == "dm":
+        warm_query(context, db_search_precedents, context.prompt, 5)
+        warm_constraints(context)
+
+    # Kick off web retrieval in the background; the planner LLM call
+    # below hides its latency. Panels that embed citations await this
+    # future; everything else proceeds without it.
+    citations_task = asyncio.ensure_future(_retrieve_citations(context, trace_path))
     
     # Initial panel hint
     yield {
@@ -97,20 +201,22 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
             "message": "Retrieving relevant policies..."
         }
     }
-    await asyncio.sleep(0.1)
+    await asyncio.sleep(0)
     
     # Phase 3: LLM-driven panel planning
     await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
         step="plan_panels",
         module=context.module,
-        input={"prompt": context.prompt}
+        input={"prompt": prompt_snippet}
     ))
     
-    panel_plan = await plan_panels(context)
+    panel_plan, prefetched = await plan_panels(context, citations_task)
+
+    # Retrieval has had the whole planning call to finish; resolve it
+    # before dispatch so the remaining panels get a plain list.
+    citations = await citations_task
     
     await write_trace(trace_path, TraceEntry(
-        t=datetime.utcnow().isoformat(),
         step="panel_plan",
         module=context.module,
         output={"panels": panel_plan}
@@ -118,54 +224,81 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
     
     print(f"[Playbook] Panel plan for {context.module}: {panel_plan}")
     
-    # Phase 3B: Execute panel plan
-    for panel_name in panel_plan:
+    # Phase 3B: Execute panel plan. The panels hit independent tables, so
+    # dispatch them concurrently and emit each as soon as it completes:
+    # the first panel reaches the client after max(fastest query), not
+    # after every query has finished.
+    async def _dispatch_one(panel_name: str):
         try:
-            panel_intent = await dispatch_panel(panel_name, context, citations)
-            
-            if panel_intent:
-                yield panel_intent
-                await asyncio.sleep(0.1)
-                
-                await write_trace(trace_path, TraceEntry(
-                    t=datetime.utcnow().isoformat(),
-                    step="emit_panel",
-                    module=context.module,
-                    output={"panel": panel_name}
-                ))
+            return panel_name, await dispatch_panel(panel_name, context, citations, prefetched), None
         except Exception as e:
-            print(f"[Playbook] Failed to dispatch panel {panel_name}: {e}")
+            return panel_name, None, e
+
+    for done in asyncio.as_completed([_dispatch_one(p) for p in panel_plan]):
+        panel_name, panel_intent, err = await done
+        if err is not None:
+            print(f"[Playbook] Failed to dispatch panel {panel_name}: {err}")
             await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
                 step="panel_error",
                 module=context.module,
                 input={"panel": panel_name},
-                error=str(e)
+                error=str(err)
+            ))
+            continue
+        if panel_intent:
+            yield panel_intent
+            await asyncio.sleep(0)
+
+            await write_trace(trace_path, TraceEntry(
+                step="emit_panel",
+                module=context.module,
+                output={"panel": panel_name}
             ))
     
     # Phase 4: Streaming reasoning tokens (via LLM if available)
+    # System prompts are precomputed per module; pass the parts as
+    # separate roles instead of stitching one large string per run.
     sys_prompt = llm.build_system_prompt(context.module)
     usr_prompt = llm.build_user_prompt(context.module, context.prompt, context.site_data, context.proposal_data)
-    stitched = f"SYSTEM:\n{sys_prompt}\n\nUSER:\n{usr_prompt}"
 
     print(f"[Playbook] Starting LLM stream for module={context.module}")
     idx = 0
     collected_tokens: List[str] = []
+    # Coalesce small LLM pieces into ~256-byte chunks: one SSE event per
+    # chunk instead of per token cuts JSON/framing overhead ~5-10x. The
+    # 25 ms time bound keeps perceived latency under a frame when the
+    # model emits slowly and the size threshold would otherwise hold
+    # tokens back.
+    buf: List[str] = []
+    buf_len = 0
+    last_flush = time.monotonic()
     try:
-        async for piece in llm.stream_text(stitched):
+        async for piece in llm.stream_text(usr_prompt, system=sys_prompt):
             if not piece:
                 continue
             collected_tokens.append(piece)
-            yield {"type": "token", "data": {"token": piece, "index": idx}}
+            buf.append(piece)
+            buf_len += len(piece)
+            if buf_len >= 256 or time.monotonic() - last_flush > 0.025:
+                yield {"type": "token", "data": {"token": "".join(buf), "index": idx}}
+                idx += 1
+                buf.clear()
+                buf_len = 0
+                last_flush = time.monotonic()
+        if buf:
+            yield {"type": "token", "data": {"token": "".join(buf), "index": idx}}
             idx += 1
-        print(f"[Playbook] LLM stream complete, yielded {idx} tokens")
+            buf.clear()
+        print(f"[Playbook] LLM stream complete, yielded {idx} token chunks")
     except Exception as e:
         print(f"[Playbook] LLM stream failed: {e}")
         # Fallback to static text if streaming fails
         fallback = generate_reasoning_text(context)
-        for i, token in enumerate(fallback.split()):
-            yield {"type": "token", "data": {"token": token + " ", "index": i}}
-            await asyncio.sleep(0.02)
+        words = fallback.split()
+        # Ten words per event; yield control between events, no pacing delay
+        for i in range(0, len(words), 10):
+            yield {"type": "token", "data": {"token": " ".join(words[i:i + 10]) + " ", "index": i // 10}}
+            await asyncio.sleep(0)
         collected_tokens = [fallback]
 
     # Phase 4B: Convert collected reasoning into follow-up actions
@@ -175,7 +308,6 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
             # Suggest actions; do not execute automatically
             suggestions = extract_actions(reasoning_text, context.module)
             await write_trace(trace_path, TraceEntry(
-                t=datetime.utcnow().isoformat(),
                 step="action_suggestions",
                 module=context.module,
                 output={"suggestions": [s.get("type") for s in suggestions]}
@@ -193,7 +325,6 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
             auto_intents = await run_auto_actions(reasoning_text, context, citations)
             if auto_intents:
                 await write_trace(trace_path, TraceEntry(
-                    t=datetime.utcnow().isoformat(),
                     step="auto_actions",
                     module=context.module,
                     output={"intents": len(auto_intents)}
@@ -203,7 +334,6 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
                 await asyncio.sleep(0.05)
     except Exception as e:
         await write_trace(trace_path, TraceEntry(
-            t=datetime.utcnow().isoformat(),
             step="auto_actions_error",
             module=context.module,
             error=str(e)
@@ -219,81 +349,186 @@ async def execute_playbook(context: ContextPack, trace_path: Path) -> AsyncGener
         }
     }
 
+# Hot query shapes, hoisted so every call reuses one string object and
+# psycopg's prepared-statement cache keys stay stable across calls
+# (exec_prepared / prepare=True server-side prepares them, so Postgres
+# reuses the plan instead of re-parsing per invocation).
+# The CTE computes the tsquery and query vector once per execution,
+# so each hybrid search binds three parameters instead of six and
+# Postgres evaluates the expressions once rather than per use.
+_POLICY_HYBRID_SQL = """
+    WITH q AS (
+        SELECT plainto_tsquery('english', %s) AS tq, %s::vector AS qv
+    )
+    SELECT p.doc_id,
+           p.title,
+           pp.text,
+           ts_rank_cd(pp.tsv, q.tq) AS rank_txt,
+           (1 - (pp.embedding <=> q.qv)) AS rank_vec,
+           (0.6 * COALESCE(ts_rank_cd(pp.tsv, q.tq), 0) +
+            0.4 * COALESCE(1 - (pp.embedding <=> q.qv), 0)) AS score
+    FROM policy_para pp
+    JOIN policy p ON p.id = pp.policy_id, q
+    WHERE pp.tsv @@ q.tq
+    ORDER BY score DESC
+    LIMIT %s
+"""
+
+# Zero-hit fallback: pure nearest-neighbour over the pgvector index
+_POLICY_KNN_SQL = """
+    SELECT p.doc_id, p.title, pp.text,
+           (1 - (pp.embedding <=> %s::vector)) AS score
+    FROM policy_para pp
+    JOIN policy p ON p.id = pp.policy_id
+    WHERE pp.embedding IS NOT NULL
+    ORDER BY pp.embedding <=> %s::vector
+    LIMIT %s
+"""
+
+_POLICY_FTS_SQL = """
+    SELECT p.doc_id, p.title, pp.text,
+           COALESCE(ts_rank_cd(pp.tsv, plainto_tsquery('english', %s)), 0) AS rank
+    FROM policy_para pp
+    JOIN policy p ON p.id = pp.policy_id
+    WHERE pp.tsv @@ plainto_tsquery('english', %s)
+    ORDER BY rank DESC
+    LIMIT %s
+"""
+
+_PRECEDENT_HYBRID_SQL = """
+    WITH q AS (
+        SELECT plainto_tsquery('english', %s) AS tq, %s::vector AS qv
+    )
+    SELECT case_ref, decision, decision_date, summary,
+           ts_rank_cd(tsv, q.tq) AS rank_txt,
+           (1 - (embedding <=> q.qv)) AS rank_vec,
+           (0.6 * COALESCE(ts_rank_cd(tsv, q.tq), 0) +
+            0.4 * COALESCE(1 - (embedding <=> q.qv), 0)) AS score
+    FROM precedent, q
+    WHERE tsv @@ q.tq
+    ORDER BY score DESC
+    LIMIT %s
+"""
+
+_PRECEDENT_KNN_SQL = """
+    SELECT case_ref, decision, decision_date, summary,
+           (1 - (embedding <=> %s::vector)) AS score
+    FROM precedent
+    WHERE embedding IS NOT NULL
+    ORDER BY embedding <=> %s::vector
+    LIMIT %s
+"""
+
+_PRECEDENT_FTS_SQL = """
+    SELECT case_ref, decision, decision_date, summary,
+           ts_rank_cd(tsv, plainto_tsquery('english', %s)) AS rank
+    FROM precedent
+    WHERE tsv @@ plainto_tsquery('english', %s)
+    ORDER BY rank DESC
+    LIMIT %s
+"""
+
+
 def db_search_policies(query: str, limit: int = 6) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     if not query:
         return results
-    
+
+    cached = _search_cache_get("policies", query, limit)
+    if cached is not None:
+        return cached
+
+    # Negative pre-checks: bail out for stopword-only queries, and when
+    # no content token can appear in either tsv column, skipping the
+    # embedding + DB round trip entirely
+    tokens = _content_tokens(query)
+    if not tokens or not lexeme_filter.might_match(tokens):
+        return results
+
     # Hybrid search with embedding (GPU-accelerated) + FTS
-    from modules.embedding import get_embedding
-    from db import to_vector
-    
     q_emb = get_embedding(query)
-    sql = """
-        SELECT p.doc_id,
-               p.title,
-               pp.text,
-               ts_rank_cd(pp.tsv, plainto_tsquery('english', %s)) AS rank_txt,
-               (1 - (pp.embedding <=> %s::vector)) AS rank_vec,
-               (0.6 * COALESCE(ts_rank_cd(pp.tsv, plainto_tsquery('english', %s)), 0) +
-                0.4 * COALESCE(1 - (pp.embedding <=> %s::vector), 0)) AS score
-        FROM policy_para pp
-        JOIN policy p ON p.id = pp.policy_id
-        WHERE (pp.tsv @@ plainto_tsquery('english', %s)) OR (pp.embedding IS NOT NULL)
-        ORDER BY score DESC
-        LIMIT %s
-    """
     try:
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, (query, to_vector(q_emb), query, to_vector(q_emb), query, limit))
-                for doc_id, title, text, rank_txt, rank_vec, score in cur.fetchall():
+            cur = exec_prepared(conn, _POLICY_HYBRID_SQL, (query, to_vector(q_emb), limit))
+            for doc_id, title, text, rank_txt, rank_vec, score in cur.fetchall():
+                results.append({"id": str(doc_id), "title": title, "text": text, "relevance": float(score or 0.0), "source": title})
+            if not results:
+                # No fulltext match: fall back to vector nearest-neighbour
+                cur = exec_prepared(conn, _POLICY_KNN_SQL, (to_vector(q_emb), to_vector(q_emb), limit))
+                for doc_id, title, text, score in cur.fetchall():
                     results.append({"id": str(doc_id), "title": title, "text": text, "relevance": float(score or 0.0), "source": title})
     except Exception as e:
         # Fallback to FTS-only if embeddings fail
         print(f"[Playbook] Hybrid search failed, falling back to FTS: {e}")
-        sql2 = """
-            SELECT p.doc_id, p.title, pp.text,
-                   COALESCE(ts_rank_cd(pp.tsv, plainto_tsquery('english', %s)), 0) AS rank
-            FROM policy_para pp
-            JOIN policy p ON p.id = pp.policy_id
-            WHERE pp.tsv @@ plainto_tsquery('english', %s) OR pp.embedding IS NOT NULL
-            ORDER BY rank DESC
-            LIMIT %s
-        """
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql2, (query, query, limit))
-                for doc_id, title, text, rank in cur.fetchall():
-                    results.append({"id": str(doc_id), "title": title, "text": text, "relevance": float(rank), "source": title})
+            cur = exec_prepared(conn, _POLICY_FTS_SQL, (query, query, limit))
+            for doc_id, title, text, rank in cur.fetchmany(limit):
+                results.append({"id": str(doc_id), "title": title, "text": text, "relevance": float(rank), "source": title})
+    _search_cache_put("policies", query, limit, results)
     return results
 
+def db_search_policies_many(queries: List[str], limit: int = 6) -> List[List[Dict[str, Any]]]:
+    """Run several policy searches over one connection in pipeline mode.
+
+    All statements are shipped to Postgres together, so N searches pay
+    one network round trip instead of N. Used where a flow needs
+    sibling searches (e.g. scenario comparison's option A/B queries).
+    """
+    embeddings = [to_vector(get_embedding(q)) for q in queries]
+    try:
+        with get_conn() as conn:
+            with pipeline(conn):
+                # One cursor per statement: results are fetched after the
+                # pipeline syncs, so a shared cursor would lose all but
+                # the last result set.
+                cursors = [
+                    conn.execute(_POLICY_HYBRID_SQL, (q, emb, limit), prepare=True)
+                    for q, emb in zip(queries, embeddings)
+                ]
+            out: List[List[Dict[str, Any]]] = []
+            for q, cur in zip(queries, cursors):
+                hits: List[Dict[str, Any]] = []
+                for doc_id, title, text, rank_txt, rank_vec, score in cur.fetchall():
+                    hits.append({"id": str(doc_id), "title": title, "text": text, "relevance": float(score or 0.0), "source": title})
+                if not hits:
+                    # Let the single-query path handle the KNN fallback
+                    hits = db_search_policies(q, limit=limit)
+                out.append(hits)
+            return out
+    except Exception as e:
+        # Degrade to sequential searches (which have their own FTS fallback)
+        print(f"[Playbook] Pipelined policy search failed, running serially: {e}")
+        return [db_search_policies(q, limit=limit) for q in queries]
+
 def db_search_precedents(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     if not query:
         return results
-    
+
+    cached = _search_cache_get("precedents", query, limit)
+    if cached is not None:
+        return cached
+
+    tokens = _content_tokens(query)
+    if not tokens or not lexeme_filter.might_match(tokens):
+        return results
+
     # Hybrid search with embedding (GPU-accelerated) + FTS
-    from modules.embedding import get_embedding
-    from db import to_vector
-    
     q_emb = get_embedding(query)
-    sql = """
-        SELECT case_ref, decision, decision_date, summary,
-               ts_rank_cd(tsv, plainto_tsquery('english', %s)) AS rank_txt,
-               (1 - (embedding <=> %s::vector)) AS rank_vec,
-               (0.6 * COALESCE(ts_rank_cd(tsv, plainto_tsquery('english', %s)), 0) +
-                0.4 * COALESCE(1 - (embedding <=> %s::vector), 0)) AS score
-        FROM precedent
-        WHERE (tsv @@ plainto_tsquery('english', %s)) OR (embedding IS NOT NULL)
-        ORDER BY score DESC
-        LIMIT %s
-    """
     try:
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, (query, to_vector(q_emb), query, to_vector(q_emb), query, limit))
-                for case_ref, decision, decision_date, summary, rank_txt, rank_vec, score in cur.fetchall():
+            cur = exec_prepared(conn, _PRECEDENT_HYBRID_SQL, (query, to_vector(q_emb), limit))
+            for case_ref, decision, decision_date, summary, rank_txt, rank_vec, score in cur.fetchall():
+                results.append({
+                    "case_ref": case_ref,
+                    "decision": decision,
+                    "similarity": float(score or 0.0),
+                    "key_point": (summary or "")[:140],
+                    "date": str(decision_date) if decision_date else None,
+                })
+            if not results:
+                cur = exec_prepared(conn, _PRECEDENT_KNN_SQL, (to_vector(q_emb), to_vector(q_emb), limit))
+                for case_ref, decision, decision_date, summary, score in cur.fetchall():
                     results.append({
                         "case_ref": case_ref,
                         "decision": decision,
@@ -304,108 +539,147 @@ def db_search_precedents(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     except Exception as e:
         # Fallback to FTS-only
         print(f"[Playbook] Precedent hybrid search failed, falling back to FTS: {e}")
-        sql2 = """
-            SELECT case_ref, decision, decision_date, summary,
-                   ts_rank_cd(tsv, plainto_tsquery('english', %s)) AS rank
-            FROM precedent
-            WHERE tsv @@ plainto_tsquery('english', %s)
-            ORDER BY rank DESC
-            LIMIT %s
-        """
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql2, (query, query, limit))
-                for case_ref, decision, decision_date, summary, rank in cur.fetchall():
-                    results.append({"case_ref": case_ref, "decision": decision, "similarity": float(rank or 0.0), "key_point": (summary or "")[:140], "date": str(decision_date) if decision_date else None})
+            cur = exec_prepared(conn, _PRECEDENT_FTS_SQL, (query, query, limit))
+            for case_ref, decision, decision_date, summary, rank in cur.fetchmany(limit):
+                results.append({"case_ref": case_ref, "decision": decision, "similarity": float(rank or 0.0), "key_point": (summary or "")[:140], "date": str(decision_date) if decision_date else None})
+    _search_cache_put("precedents", query, limit, results)
     return results
 
+def _evidence_row_to_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "title": row[1],
+        "type": row[2],
+        "topic_tags": row[3] or [],
+        "geographic_scope": row[4],
+        "author": row[5],
+        "publisher": row[6],
+        "year": row[7],
+        "source_type": row[8],
+        "spatial_layer_ref": row[9],
+        "key_findings": row[10],
+        "status": row[11],
+        "reliability_flags": row[12] or {},
+        "notes": row[13],
+        "version_count": row[14],
+    }
+
 def db_search_evidence(query: str, topics: List[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
     """Search evidence base - internal function for reasoning flow."""
     results: List[Dict[str, Any]] = []
     if not query:
         return results
     
+    # One grouped join for version counts instead of a correlated
+    # COUNT(*) subquery per returned row
     sql_parts = ["""
         SELECT e.id, e.title, e.type, e.topic_tags, e.geographic_scope,
                e.author, e.publisher, e.year, e.source_type, e.spatial_layer_ref,
                e.key_findings, e.status, e.reliability_flags, e.notes,
-               COALESCE((SELECT COUNT(*) FROM evidence_version ev WHERE ev.evidence_id = e.id), 0) as version_count
+               COALESCE(ev.c, 0) as version_count
         FROM evidence e
+        LEFT JOIN (
+            SELECT evidence_id, COUNT(*)::int AS c
+            FROM evidence_version
+            GROUP BY evidence_id
+        ) ev ON ev.evidence_id = e.id
     """]
     where_clauses = []
     params = []
-    
-    # Simple text search on title and key_findings
-    where_clauses.append("(e.title ILIKE %s OR e.key_findings ILIKE %s)")
-    params.extend([f"%{query}%", f"%{query}%"])
-    
+    like = f"%{query}%"
+
+    # Indexed fulltext over the generated tsv column (title, findings,
+    # publisher, author, scope, tags — see add_evidence_fulltext.sql),
+    # with a trigram-indexed ILIKE for partial title matches
+    where_clauses.append(
+        "(e.tsv @@ websearch_to_tsquery('english', %s) OR e.title ILIKE %s)"
+    )
+    params.extend([query, like])
+
     # Topic filter
     if topics:
         where_clauses.append("e.topic_tags && %s")
         params.append(topics)
-    
-    if where_clauses:
-        sql_parts.append("WHERE " + " AND ".join(where_clauses))
-    
-    sql_parts.append("ORDER BY e.updated_at DESC LIMIT %s")
-    params.append(limit)
-    
+
+    sql_parts.append("WHERE " + " AND ".join(where_clauses))
+    sql_parts.append(
+        "ORDER BY ts_rank_cd(e.tsv, websearch_to_tsquery('english', %s)) DESC, "
+        "e.updated_at DESC LIMIT %s"
+    )
+    params.extend([query, limit])
+
     sql = " ".join(sql_parts)
-    
+
     try:
         with get_conn() as conn:
-            with conn.cursor() as cur:
+            # Server-side cursor: rows stream in limit-sized batches
+            # instead of materializing the whole result set up front
+            with conn.cursor(name="evidence_search") as cur:
+                cur.itersize = limit
                 cur.execute(sql, params)
-                for row in cur.fetchall():
-                    results.append({
-                        "id": row[0],
-                        "title": row[1],
-                        "type": row[2],
-                        "topic_tags": row[3] or [],
-                        "geographic_scope": row[4],
-                        "author": row[5],
-                        "publisher": row[6],
-                        "year": row[7],
-                        "source_type": row[8],
-                        "spatial_layer_ref": row[9],
-                        "key_findings": row[10],
-                        "status": row[11],
-                        "reliability_flags": row[12] or {},
-                        "notes": row[13],
-                        "version_count": row[14],
-                    })
+                for row in cur.fetchmany(limit):
+                    results.append(_evidence_row_to_dict(row))
     except Exception as e:
-        print(f"[Playbook] Evidence search failed: {e}")
-    
+        # Degrade to the ILIKE scan if the tsv migration hasn't run
+        print(f"[Playbook] Evidence fulltext search failed, falling back to ILIKE: {e}")
+        fb_parts = [sql_parts[0], "WHERE (e.title ILIKE %s OR e.key_findings ILIKE %s)"]
+        fb_params = [like, like]
+        if topics:
+            fb_parts[-1] += " AND e.topic_tags && %s"
+            fb_params.append(topics)
+        fb_parts.append("ORDER BY e.updated_at DESC LIMIT %s")
+        fb_params.append(limit)
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(" ".join(fb_parts), fb_params)
+                    for row in cur.fetchmany(limit):
+                        results.append(_evidence_row_to_dict(row))
+        except Exception as e2:
+            print(f"[Playbook] Evidence search failed: {e2}")
+
     return results
 
-def db_constraints(context: ContextPack) -> List[Dict[str, Any]]:
-    lat = None
-    lng = None
-    if context.site_data and isinstance(context.site_data, dict):
-        lat = context.site_data.get("lat")
-        lng = context.site_data.get("lng")
-    if lat is None or lng is None:
-        return []
-    results: List[Dict[str, Any]] = []
-    sql = """
-        WITH pt AS (
-          SELECT ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 27700) AS g
-        )
-        SELECT l.layer_type, COALESCE(g.name, l.name) AS name
-        FROM layer l
-        JOIN layer_geom g ON g.layer_id = l.id
-        CROSS JOIN pt
-        WHERE ST_DWithin(g.geom, pt.g, %s)
-        LIMIT 25
+_CONSTRAINTS_SQL = """
+    WITH pt AS (
+      SELECT ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 27700) AS g
+    )
+    SELECT l.layer_type, COALESCE(g.name, l.name) AS name
+    FROM layer l
+    JOIN layer_geom g ON g.layer_id = l.id
+    CROSS JOIN pt
+    WHERE ST_DWithin(g.geom, pt.g, %s)
+    LIMIT 25
+"""
+
+
+@functools.lru_cache(maxsize=1024)
+def _constraints_cached(lat_q: float, lng_q: float) -> tuple:
+    """ST_DWithin lookup memoized on ~10 m-quantized coordinates.
+
+    The same site gets queried repeatedly across dm/evidence requests;
+    within the 100 m search radius a 4-decimal-place grid is well below
+    the noise floor, so repeats skip the PostGIS round trip entirely.
+    Clear via _constraints_cached.cache_clear() after layer ingest.
     """
+    results = []
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(sql, (lng, lat, 100))
+            cur.execute(_CONSTRAINTS_SQL, (lng_q, lat_q, 100))
             for layer_type, name in cur.fetchall():
                 impact = "high" if (layer_type or "").lower() in {"constraint", "designation"} else "moderate"
                 results.append({"type": layer_type, "name": name or "", "impact": impact})
-    return results
+    return tuple(results)
+
+
+def db_constraints(context: ContextPack) -> List[Dict[str, Any]]:
+    lat = context.site_data.get("lat")
+    lng = context.site_data.get("lng")
+    if lat is None or lng is None:
+        return []
+    # Shallow-copy the rows so callers can't mutate the cached entry
+    return [dict(row) for row in _constraints_cached(round(lat, 4), round(lng, 4))]
 
 def compute_planning_balance(policies: List[Dict[str, Any]], precedents: List[Dict[str, Any]]) -> Dict[str, Any]:
     benefits = [
@@ -428,23 +702,19 @@ def compute_draft_decision(balance: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 def compute_themes(text: str) -> List[Dict[str, Any]]:
-    import re
-    from collections import Counter
-    tokens = re.findall(r"[a-zA-Z']+", (text or "").lower())
-    stop = set("a an the of in on at to for and or if is are was were be been being with by from as this that these those it its their our your you we they he she them his her i me my mine ours yours theirs not no".split())
-    toks = [t for t in tokens if t not in stop and len(t) > 2]
-    bigrams = [f"{toks[i]} {toks[i+1]}" for i in range(len(toks)-1)] if len(toks) > 1 else []
-    top = Counter(bigrams).most_common(5)
+    toks = [t for t in _TOKEN_RE.findall((text or "").lower())
+            if len(t) > 2 and t not in _THEME_STOP]
+    # Count tuple bigrams; only the top five get joined into strings
+    top = Counter(zip(toks, toks[1:])).most_common(5)
     out: List[Dict[str, Any]] = []
-    for phrase, count in top:
-        sentiment = "negative" if any(w in phrase for w in ["concern", "object", "oppose", "traffic", "noise"]) else "positive"
+    for (a, b), count in top:
+        phrase = f"{a} {b}"
+        sentiment = "negative" if any(w in phrase for w in _THEME_NEG) else "positive"
         out.append({"theme": phrase.title(), "count": count, "sentiment": sentiment})
     return out
 
-def generate_reasoning_text(context: ContextPack) -> str:
-    """Generate reasoning narrative based on module."""
-    
-    templates = {
+# Static fallback narratives, read-only and built once
+_REASONING_TEMPLATES = MappingProxyType({
         "dm": "Based on the proposal details and local planning policy, I have identified the key material considerations. The scheme delivers housing in a sustainable location and demonstrates acceptable design quality. While there are some concerns regarding height and massing, these can be addressed through conditions. On balance, I recommend approval.",
         
         "policy": "Analyzing policy consistency across the plan. The draft housing policy aligns with national guidance but may benefit from clearer integration with environmental policies. Consider cross-referencing green infrastructure requirements.",
@@ -456,15 +726,24 @@ def generate_reasoning_text(context: ContextPack) -> str:
         "feedback": "Analysis of consultation responses reveals two dominant themes: traffic and parking concerns (47 responses) and support for new housing (32 responses). Objections are concentrated in the immediate area, while support is more geographically distributed.",
         
         "evidence": "The evidence base reveals multiple site constraints including conservation area designation and flood risk (Zone 2). However, the site is also within a town centre location with excellent public transport access. 12 relevant policies apply, primarily focused on design quality and heritage protection."
-    }
-    
-    return templates.get(context.module, "Analysis in progress...")
+})
+
+
+def generate_reasoning_text(context: ContextPack) -> str:
+    """Generate reasoning narrative based on module."""
+    return _REASONING_TEMPLATES.get(context.module, "Analysis in progress...")
+
+
+# Precomputed per-module lookup tables: exact domains as a frozenset,
+# subdomain matching as a tuple for str.endswith (a single C-level scan
+# rather than a Python loop per allowed domain).
+_ALLOWED_EXACT = {m: frozenset(ds) for m, ds in ALLOWED_BY_MODULE.items()}
+_ALLOWED_SUFFIX = {m: tuple("." + d for d in ds) for m, ds in ALLOWED_BY_MODULE.items()}
 
 
 def _domain_allowed(domain: str, module: str) -> bool:
     domain = (domain or "").lower()
-    allowed = ALLOWED_BY_MODULE.get(module, [])
-    for d in allowed:
-        if domain == d or domain.endswith("." + d):
-            return True
-    return False
+    exact = _ALLOWED_EXACT.get(module)
+    if exact is None:
+        return False
+    return domain in exact or domain.endswith(_ALLOWED_SUFFIX[module])
@@ -5,49 +5,72 @@ Calls the internal proxy with token, performs /search, /download, /extract.
 from __future__ import annotations
 
 import os
-import json
+import re
 from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
 import aiohttp
 
+# Fast path for the scheme://netloc/... shape virtually every search
+# result has; odd URLs fall back to urlparse
+_NETLOC_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.\-]*://([^/?#]+)")
+
 PROXY_BASE_URL = os.getenv("PROXY_BASE_URL", "http://127.0.0.1:8082")
 PROXY_TOKEN = os.getenv("PROXY_INTERNAL_TOKEN", "change-me-long-random")
 TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "60"))
 
+_TIMEOUT = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
+_HEADERS = {"X-Proxy-Token": PROXY_TOKEN}
+
+# One session for all proxy calls: connections stay keep-alive across the
+# N+1 hits per playbook run instead of paying a handshake each time.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=_TIMEOUT,
+            connector=aiohttp.TCPConnector(
+                limit=32, limit_per_host=8, keepalive_timeout=30
+            ),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared session (called from the kernel shutdown hook)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    session = _get_session()
+    async with session.post(f"{PROXY_BASE_URL}{path}", json=payload, headers=_HEADERS) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
 
 async def proxy_search(q: str) -> List[Dict[str, Any]]:
-    url = f"{PROXY_BASE_URL}/search"
-    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
-    headers = {"X-Proxy-Token": PROXY_TOKEN}
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.post(url, json={"q": q}, headers=headers) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
-            return data.get("results", [])
+    data = await _post("/search", {"q": q})
+    return data.get("results", [])
 
 
 async def proxy_download(url_in: str) -> Dict[str, Any]:
-    url = f"{PROXY_BASE_URL}/download"
-    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
-    headers = {"X-Proxy-Token": PROXY_TOKEN}
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.post(url, json={"url": url_in}, headers=headers) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+    return await _post("/download", {"url": url_in})
 
 
 async def proxy_extract(cache_key: str) -> Dict[str, Any]:
-    url = f"{PROXY_BASE_URL}/extract"
-    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
-    headers = {"X-Proxy-Token": PROXY_TOKEN}
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.post(url, json={"cache_key": cache_key}, headers=headers) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+    return await _post("/extract", {"cache_key": cache_key})
 
 
 def domain_from_url(url: str) -> str:
+    m = _NETLOC_RE.match(url)
+    if m:
+        return m.group(1).lower()
     try:
-        from urllib.parse import urlparse
         return urlparse(url).netloc.lower()
     except Exception:
         return ""
@@ -3,6 +3,7 @@ Turns reasoning into concrete actions via LLM with structured output.
 Traces context from knowledge graph, spatial layers, evidence base, etc.
 """
 from typing import List, Dict, Any
+import asyncio
 import json
 
 from .context import ContextPack
@@ -10,6 +11,11 @@ from .llm import call_llm
 from . import playbook as pb
 
 
+async def _a(fn, *args, **kwargs):
+    """Run a blocking DB call on a worker thread so the loop stays free."""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
 async def extract_actions(reasoning: str, context: ContextPack) -> List[Dict[str, Any]]:
     """
     Use LLM with structured output to determine what actions to take.
@@ -42,7 +48,7 @@ async def extract_actions(reasoning: str, context: ContextPack) -> List[Dict[str
     # Spatial context (constraints, designations, site characteristics)
     if context.site_data and context.module in ["dm", "strategy", "vision"]:
         try:
-            constraints = pb.db_constraints(context) or []
+            constraints = await _a(pb.db_constraints, context) or []
             context_traces.append({
                 "type": "spatial_context",
                 "constraints": [c.get("type") for c in constraints],
@@ -169,7 +175,8 @@ async def execute_actions(actions: List[Dict[str, Any]], context: ContextPack, c
                 if any(w in query_lower for w in ["environment", "climate"]):
                     topics.append("climate")
                 
-                items = pb.db_search_evidence(
+                items = await _a(
+                    pb.db_search_evidence,
                     a.get("query") or context.prompt,
                     topics=topics if topics else None,
                     limit=50
@@ -186,26 +193,31 @@ async def execute_actions(actions: List[Dict[str, Any]], context: ContextPack, c
             
             # Policy/DM actions
             elif t in ["search_policies", "policy.search"]:
-                hits = pb.db_search_policies(a.get("query") or context.prompt, limit=8)
+                hits = await _a(pb.db_search_policies, a.get("query") or context.prompt, limit=8)
                 show("applicable_policies", {"policies": hits, "citations": citations})
 
             elif t in ["precedents", "precedent.search"]:
-                hits = pb.db_search_precedents(a.get("query") or context.prompt, limit=6)
+                hits = await _a(pb.db_search_precedents, a.get("query") or context.prompt, limit=6)
                 show("precedents", {"items": hits, "citations": citations})
 
             elif t in ["spatial_constraints", "spatial.constraints"]:
-                cons = pb.db_constraints(context) or []
+                cons = await _a(pb.db_constraints, context) or []
                 show("evidence_snapshot", {"constraints": cons, "policy_count": len(cons), "citations": citations})
 
             elif t in ["planning_balance", "planning.balance"]:
-                pol = pb.db_search_policies(context.prompt, limit=6)
-                pre = pb.db_search_precedents(context.prompt, limit=5)
+                # Independent tables: let Postgres run both in parallel
+                pol, pre = await asyncio.gather(
+                    _a(pb.db_search_policies, context.prompt, limit=6),
+                    _a(pb.db_search_precedents, context.prompt, limit=5),
+                )
                 bal = pb.compute_planning_balance(pol, pre)
                 show("planning_balance", {"balance": bal, "policies": pol, "precedents": pre, "citations": citations})
 
             elif t in ["draft_decision", "draft.decision"]:
-                pol = pb.db_search_policies(context.prompt, limit=6)
-                pre = pb.db_search_precedents(context.prompt, limit=5)
+                pol, pre = await asyncio.gather(
+                    _a(pb.db_search_policies, context.prompt, limit=6),
+                    _a(pb.db_search_precedents, context.prompt, limit=5),
+                )
                 bal = pb.compute_planning_balance(pol, pre)
                 dec = pb.compute_draft_decision(bal)
                 show("draft_decision", {"decision": dec, "balance": bal, "citations": citations})
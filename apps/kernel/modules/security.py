@@ -4,7 +4,7 @@ Input validation, rate limiting, and safety checks for the reasoning engine.
 import re
 import time
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 
 # Rate limiting storage (in-memory, move to Redis for production)
@@ -187,7 +187,7 @@ def log_security_event(
     In production, send to SIEM or security logging system.
     """
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "event_type": event_type,
         "identifier": identifier,
         "severity": severity,
@@ -210,7 +210,7 @@ def audit_operation(
     Audit sensitive operations for compliance.
     """
     audit_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "operation": operation,
         "user_id": user_id,
         "module": module,
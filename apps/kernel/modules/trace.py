@@ -1,12 +1,33 @@
 """Trace logging for reasoning sessions."""
+import asyncio
 import json
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional
-from pydantic import BaseModel
 
-class TraceEntry(BaseModel):
-    """Single trace entry."""
-    t: str  # ISO timestamp
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Entries are queued and drained by a single background task that batches
+# writes per file, keeping disk I/O off the SSE streaming path.
+_FLUSH_INTERVAL = 0.05   # seconds to wait for more entries before flushing
+_FLUSH_BATCH = 64        # max entries per flush
+
+_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+
+@dataclass(slots=True)
+class TraceEntry:
+    """Single trace entry.
+
+    Internal log record built from already-known values on the hot
+    path, so a slotted dataclass (no validation pass, roughly half the
+    per-instance memory of a model) is enough.
+    """
     step: str
     module: Optional[str] = None
     tool: Optional[str] = None
@@ -14,8 +35,98 @@ class TraceEntry(BaseModel):
     output: Optional[Any] = None
     ms: Optional[int] = None
     error: Optional[str] = None
+    t: float = field(default_factory=time.time)  # unix time; ISO-formatted on flush
 
 async def write_trace(path: Path, entry: TraceEntry):
-    """Append trace entry to JSONL file."""
-    with open(path, 'a') as f:
-        f.write(entry.model_dump_json() + '\n')
+    """Queue a trace entry for the background writer.
+
+    Falls back to a direct append when no event loop is running
+    (sync scripts, tests).
+    """
+    q = _ensure_writer()
+    if q is None:
+        with open(path, 'a') as f:
+            f.write(_dump_entry(entry) + '\n')
+        return
+    q.put_nowait((path, entry))
+
+def _dump_entry(entry: TraceEntry) -> str:
+    """Serialize an entry with orjson; fall back to the stdlib encoder.
+
+    Runs in the background writer, so timestamp formatting and JSON
+    encoding stay off the request path entirely.
+    """
+    d = asdict(entry)
+    d["t"] = datetime.fromtimestamp(d["t"], tz=timezone.utc).isoformat()
+    if orjson is not None:
+        return orjson.dumps(d).decode()
+    return json.dumps(d)
+
+def write_trace_nowait(path: Path, entry: TraceEntry) -> None:
+    """Synchronous enqueue for callers on the event loop.
+
+    Skips the coroutine allocation/await of write_trace; entries land in
+    the same background batch writer.
+    """
+    q = _ensure_writer()
+    if q is None:
+        with open(path, 'a') as f:
+            f.write(_dump_entry(entry) + '\n')
+        return
+    q.put_nowait((path, entry))
+
+def start_writer() -> None:
+    """Start the background writer task (called on app startup)."""
+    _ensure_writer()
+
+async def flush_traces() -> None:
+    """Drain any queued entries to disk (called on app shutdown)."""
+    if _queue is None:
+        return
+    batches: Dict[Path, list] = {}
+    while not _queue.empty():
+        path, entry = _queue.get_nowait()
+        batches.setdefault(path, []).append(_dump_entry(entry))
+    _write_batches(batches)
+
+def _ensure_writer() -> Optional[asyncio.Queue]:
+    global _queue, _writer_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    if _queue is None:
+        _queue = asyncio.Queue()
+    if _writer_task is None or _writer_task.done():
+        _writer_task = loop.create_task(_drain())
+    return _queue
+
+async def _drain() -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        path, entry = await _queue.get()
+        batches: Dict[Path, list] = {path: [_dump_entry(entry)]}
+        count = 1
+        # Coalesce whatever else arrives within the flush window
+        deadline = loop.time() + _FLUSH_INTERVAL
+        while count < _FLUSH_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                path, entry = await asyncio.wait_for(_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batches.setdefault(path, []).append(_dump_entry(entry))
+            count += 1
+        # One open/write per file per batch, on a worker thread so even
+        # a slow disk never stalls the loop between SSE events
+        await asyncio.to_thread(_write_batches, batches)
+
+def _write_batches(batches: Dict[Path, list]) -> None:
+    for path, lines in batches.items():
+        try:
+            with open(path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        except Exception as e:
+            print(f"[Trace] Failed to write {path}: {e}")
@@ -7,6 +7,8 @@ from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel, Field
 from db import get_conn
 import hashlib
+import json
+import time
 
 router = APIRouter()
 
@@ -302,11 +304,30 @@ async def link_to_policy(evidence_id: int, req: LinkPolicyRequest):
 # Dependency Graph
 # ============================================================================
 
+# The link graph changes minutes-to-hours apart but is asked for on every
+# "dependencies" action, so serve it from a short TTL cache. Each cached
+# graph carries an ETag so the frontend can skip re-rendering an
+# unchanged panel.
+_GRAPH_TTL = 60.0
+_graph_cache: Dict[Any, Any] = {}
+
+
+def _graph_etag(graph: Dict[str, Any]) -> str:
+    return hashlib.blake2b(
+        json.dumps(graph, sort_keys=True).encode(), digest_size=8
+    ).hexdigest()
+
+
 @router.get("/graph/dependencies")
 async def get_dependency_graph(policy_id: Optional[int] = None, evidence_id: Optional[int] = None):
     """
-    Return evidence ↔ policy dependency graph.
+    Return evidence ↔ policy dependency graph (cached for 60s, with ETag).
     """
+    cache_key = (policy_id, evidence_id)
+    hit = _graph_cache.get(cache_key)
+    if hit is not None and time.monotonic() - hit[0] < _GRAPH_TTL:
+        return hit[1]
+
     with get_conn() as conn:
         with conn.cursor() as cur:
             where = []
@@ -350,7 +371,10 @@ async def get_dependency_graph(policy_id: Optional[int] = None, evidence_id: Opt
                     "rationale": rationale
                 })
             
-            return {"nodes": nodes, "edges": edges}
+            graph = {"nodes": nodes, "edges": edges}
+            graph["etag"] = _graph_etag(graph)
+            _graph_cache[cache_key] = (time.monotonic(), graph)
+            return graph
 
 # ============================================================================
 # Gap Analysis
@@ -0,0 +1,86 @@
+"""
+In-memory cache in front of evidence searches.
+
+Repeated prompts ("housing evidence Westminster") otherwise re-run an
+embedding plus a DB search every time. Two tiers:
+
+1. Exact: LRU keyed on the normalised search parameters, TTL-bounded.
+2. Semantic: cosine similarity against the embeddings of recent queries,
+   so near-duplicate phrasings hit the same cached result set.
+
+The semantic tier uses a plain numpy dot product over a small matrix of
+recent query vectors rather than a vector index — at a few hundred
+entries a brute-force scan is faster than maintaining one.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TTL = 300.0            # seconds an entry stays valid
+_MAX_ENTRIES = 1024     # exact-tier LRU bound
+_MAX_VECTORS = 256      # semantic-tier bound (rolling window)
+_SIM_THRESHOLD = 0.95   # cosine similarity to count as a duplicate query
+_GAPS_TTL = 60.0        # evidence_gaps() is keyless; cache it briefly
+
+
+class EvidenceCache:
+    """Exact + semantic result cache for evidence searches."""
+
+    def __init__(self):
+        self._exact: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._vectors: List[Any] = []   # normalised query embeddings
+        self._vector_keys: List[Tuple] = []
+        self._gaps: Optional[Tuple[float, Dict[str, Any]]] = None
+
+    def get(self, key: Tuple, embedding: Optional[List[float]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Return cached items for an exact or semantically-similar query."""
+        hit = self._exact.get(key)
+        if hit is not None:
+            ts, items = hit
+            if time.monotonic() - ts < _TTL:
+                self._exact.move_to_end(key)
+                return items
+            del self._exact[key]
+        if embedding is not None and np is not None and self._vectors:
+            q = np.asarray(embedding, dtype=np.float32)
+            q /= (np.linalg.norm(q) or 1.0)
+            sims = np.stack(self._vectors) @ q
+            best = int(np.argmax(sims))
+            if sims[best] >= _SIM_THRESHOLD:
+                near = self._exact.get(self._vector_keys[best])
+                if near is not None and time.monotonic() - near[0] < _TTL:
+                    return near[1]
+        return None
+
+    def put(self, key: Tuple, items: List[Dict[str, Any]], embedding: Optional[List[float]] = None) -> None:
+        """Store a result set; optionally register its query embedding."""
+        self._exact[key] = (time.monotonic(), items)
+        self._exact.move_to_end(key)
+        while len(self._exact) > _MAX_ENTRIES:
+            self._exact.popitem(last=False)
+        if embedding is not None and np is not None:
+            v = np.asarray(embedding, dtype=np.float32)
+            v /= (np.linalg.norm(v) or 1.0)
+            self._vectors.append(v)
+            self._vector_keys.append(key)
+            if len(self._vectors) > _MAX_VECTORS:
+                self._vectors.pop(0)
+                self._vector_keys.pop(0)
+
+    def get_gaps(self) -> Optional[Dict[str, Any]]:
+        """Cached evidence_gaps() result, if still fresh."""
+        if self._gaps is not None and time.monotonic() - self._gaps[0] < _GAPS_TTL:
+            return self._gaps[1]
+        return None
+
+    def put_gaps(self, gaps: Dict[str, Any]) -> None:
+        self._gaps = (time.monotonic(), gaps)
+
+
+# Shared process-wide instance
+evidence_cache = EvidenceCache()
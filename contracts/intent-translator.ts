@@ -50,7 +50,15 @@ export function translateIntent(
       case 'update_panel':
         ops.push(...translateUpdatePanel(intent, context, errors));
         break;
-        
+
+      case 'append_panel_items':
+        ops.push(...translateAppendPanelItems(intent, context, errors));
+        break;
+
+      case 'merge_panel_data':
+        ops.push(...translateMergePanelData(intent, context, errors));
+        break;
+
       case 'remove_panel':
         ops.push(...translateRemovePanel(intent, context, errors));
         break;
@@ -172,19 +180,110 @@ function translateUpdatePanel(
     return [];
   }
   
-  // For now, we'll use a placeholder and the reducer will resolve by ID
-  // In a real implementation, we'd track indices more carefully
+  // A -1 index is a placeholder; the reducer resolves the '*' path
+  // against applied state via panelId
   const path = index >= 0 ? `/panels/${index}/data` : `/panels/*/data`;
-  
+
   const op: PatchOp = {
     op: 'replace',
     path,
     value: intent.data || {},
+    panelId,
   };
-  
+
   return [op];
 }
 
+/**
+ * Resolve a panel's index from an intent's id/panel fields
+ * Shared by the incremental-update translations below
+ */
+function resolvePanelIndex(
+  intent: Intent,
+  context: TranslationContext,
+  action: string,
+  errors: string[]
+): { panelId: string; index: number } | undefined {
+  if (!intent.id && !intent.panel) {
+    errors.push(`${action} intent missing id or panel type`);
+    return undefined;
+  }
+
+  const panelId = intent.id || (intent.panel || '');
+  const index = context.panelIndices.get(panelId);
+
+  if (index === undefined) {
+    errors.push(`Panel ${panelId} not found for ${action}`);
+    return undefined;
+  }
+
+  return { panelId, index };
+}
+
+/**
+ * Translate append_panel_items intent to add operations on the panel's
+ * data.items array — one op per item — so streamed result batches
+ * extend the list instead of replacing the panel data wholesale
+ */
+function translateAppendPanelItems(
+  intent: Intent,
+  context: TranslationContext,
+  errors: string[]
+): PatchOp[] {
+  const target = resolvePanelIndex(intent, context, 'append_panel_items', errors);
+  if (target === undefined) {
+    return [];
+  }
+
+  const items = (intent.data as { items?: unknown[] } | undefined)?.items;
+  if (!Array.isArray(items)) {
+    errors.push('append_panel_items intent missing data.items array');
+    return [];
+  }
+
+  // A -1 index means the panel's add op is earlier in this batch; the
+  // reducer resolves the '*' placeholder via panelId at apply time.
+  const base = target.index >= 0 ? `/panels/${target.index}/data/items` : `/panels/*/data/items`;
+
+  return items.map(item => ({
+    op: 'add' as const,
+    path: `${base}/-`,
+    value: item,
+    panelId: target.panelId,
+  }));
+}
+
+/**
+ * Translate merge_panel_data intent to targeted replace operations —
+ * one per top-level key of intent.data — leaving the panel's other
+ * data fields (e.g. streamed items) untouched
+ */
+function translateMergePanelData(
+  intent: Intent,
+  context: TranslationContext,
+  errors: string[]
+): PatchOp[] {
+  const target = resolvePanelIndex(intent, context, 'merge_panel_data', errors);
+  if (target === undefined) {
+    return [];
+  }
+
+  const data = intent.data as Record<string, unknown> | undefined;
+  if (!data || typeof data !== 'object') {
+    errors.push('merge_panel_data intent missing data object');
+    return [];
+  }
+
+  const base = target.index >= 0 ? `/panels/${target.index}/data` : `/panels/*/data`;
+
+  return Object.entries(data).map(([key, value]) => ({
+    op: 'replace' as const,
+    path: `${base}/${key}`,
+    value,
+    panelId: target.panelId,
+  }));
+}
+
 /**
  * Translate remove_panel intent to remove operation
  */
@@ -207,10 +306,11 @@ function translateRemovePanel(
   }
   
   const path = index >= 0 ? `/panels/${index}` : `/panels/*`;
-  
+
   const op: PatchOp = {
     op: 'remove',
     path,
+    panelId,
   };
   
   // Update context
@@ -183,7 +183,7 @@ function applyOperation(
   console.log(`[applyOperation] Starting op ${opIndex}:`, op.op, op.path);
   
   const pathParts = parsePath(op.path);
-  
+
   if (pathParts[0] !== 'panels') {
     throw new PatchError(
       `Invalid path: only /panels/* operations are allowed`,
@@ -191,6 +191,29 @@ function applyOperation(
       opIndex
     );
   }
+
+  // Resolve the '*' placeholder the translator emits when the target
+  // panel was created in the same batch: ops apply in order against the
+  // cloned state, so by now the panel's own add has run and the id
+  // lookup finds it.
+  if (pathParts[1] === '*') {
+    if (!op.panelId) {
+      throw new PatchError(
+        `Wildcard path requires a panelId to resolve`,
+        PatchErrorType.VALIDATION,
+        opIndex
+      );
+    }
+    const resolved = state.panels.findIndex((p: PanelData) => p.id === op.panelId);
+    if (resolved === -1) {
+      throw new PatchError(
+        `Panel ${op.panelId} not found`,
+        PatchErrorType.NOT_FOUND,
+        opIndex
+      );
+    }
+    pathParts[1] = String(resolved);
+  }
   
   switch (op.op) {
     case 'add':
@@ -230,7 +253,14 @@ function applyAdd(
   opIndex: number
 ): void {
   console.log('[applyAdd] Starting, pathParts:', pathParts, 'value type:', value?.type);
-  
+
+  // Deep add: append one element to an array field under a panel's data
+  // (e.g. /panels/3/data/items/-), used for streamed result batches
+  if (pathParts.length === 5 && pathParts[2] === 'data' && pathParts[4] === '-') {
+    applyDataArrayAppend(state, pathParts, value, budget, opIndex);
+    return;
+  }
+
   if (pathParts.length !== 2) {
     throw new PatchError(
       `Invalid add path: expected /panels/- or /panels/<index>`,
@@ -314,6 +344,60 @@ function applyAdd(
   addPanelToBudget(budget, panel.type);
 }
 
+/**
+ * Append a value to an array field under a panel's data
+ * Counts against the update budget, not the panel budget
+ */
+function applyDataArrayAppend(
+  state: DashboardState,
+  pathParts: string[],
+  value: any,
+  budget: BudgetTracker,
+  opIndex: number
+): void {
+  const index = parseInt(pathParts[1], 10);
+  if (isNaN(index) || index < 0 || index >= state.panels.length) {
+    throw new PatchError(
+      `Panel index ${pathParts[1]} not found`,
+      PatchErrorType.NOT_FOUND,
+      opIndex
+    );
+  }
+
+  const panel = state.panels[index];
+
+  if (!canUpdatePanel(panel.type)) {
+    throw new PatchError(
+      `Updates not allowed for panel type '${panel.type}'`,
+      PatchErrorType.PERMISSION,
+      opIndex
+    );
+  }
+
+  const field = pathParts[3];
+  const current = (panel.data as Record<string, unknown>)?.[field];
+  if (!Array.isArray(current)) {
+    throw new PatchError(
+      `Field '${field}' is not an array on panel ${panel.id}`,
+      PatchErrorType.VALIDATION,
+      opIndex
+    );
+  }
+
+  const newData = { ...(panel.data as Record<string, unknown>), [field]: [...current, value] };
+  const panelValidation = validatePanel({ ...panel, data: newData });
+  if (!panelValidation.valid) {
+    throw new PatchError(
+      `Invalid panel data: ${panelValidation.error}`,
+      PatchErrorType.VALIDATION,
+      opIndex
+    );
+  }
+
+  state.panels[index] = { ...panel, data: newData };
+  addUpdateToBudget(budget);
+}
+
 /**
  * Replace operation - update panel data or entire panel
  */
@@ -353,7 +437,23 @@ function applyReplace(
     );
   }
   
-  if (pathParts.length === 2) {
+  if (pathParts.length === 4 && pathParts[2] === 'data') {
+    // Targeted field update: merge one key into data instead of
+    // replacing the whole object (e.g. /panels/3/data/summary), so a
+    // summary-only update can't clobber streamed items
+    const key = pathParts[3];
+    const newData = { ...(panel.data as Record<string, unknown>), [key]: value };
+    const panelValidation = validatePanel({ ...panel, data: newData });
+    if (!panelValidation.valid) {
+      throw new PatchError(
+        `Invalid panel data: ${panelValidation.error}`,
+        PatchErrorType.VALIDATION,
+        opIndex
+      );
+    }
+
+    state.panels[index] = { ...panel, data: newData };
+  } else if (pathParts.length === 2) {
     // Replace entire panel
     const panelValidation = validatePanel(value);
     if (!panelValidation.valid) {
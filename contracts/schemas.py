@@ -44,6 +44,7 @@ class PatchOperation(BaseModel):
     path: str = Field(..., min_length=1, description="JSON pointer path")
     value: Optional[Any] = None
     from_: Optional[str] = Field(None, alias="from", description="Source path for move/copy")
+    panel_id: Optional[str] = Field(None, alias="panelId", description="Target panel id for resolving '*' paths")
 
     class Config:
         use_enum_values = True
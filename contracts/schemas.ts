@@ -231,6 +231,8 @@ export const EvidenceBrowserDataSchema = z.object({
     reliability_flags: z.record(z.string(), z.unknown()),
   })),
   filters: z.record(z.string(), z.unknown()).optional(),
+  // Aggregate counts merged in after the item batches have streamed
+  summary: z.record(z.string(), z.unknown()).optional(),
 });
 
 export const EvidenceRecordDataSchema = z.object({
@@ -337,6 +339,9 @@ export const PatchOpSchema = z.object({
   path: z.string().min(1, "Path required"),
   value: z.unknown().optional(),
   from: z.string().optional(), // for move/copy ops
+  // Target panel id, used to resolve '*' placeholder paths at apply
+  // time when the panel was created earlier in the same batch
+  panelId: z.string().optional(),
 });
 
 export type PatchOp = z.infer<typeof PatchOpSchema>;
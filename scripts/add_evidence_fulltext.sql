@@ -0,0 +1,35 @@
+-- Add a generated tsvector column and indexes for evidence search
+-- Run this after evidence_schema.sql; mirrors add_fulltext_indexes.sql
+
+\c tpa
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Generated-column expressions must be IMMUTABLE, and array_to_string
+-- is only STABLE (because of its anyarray-to-text casting); for text[]
+-- it is immutable in practice, so wrap it in an immutable SQL helper.
+CREATE OR REPLACE FUNCTION immutable_array_to_string(text[], text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT array_to_string($1, $2) $$;
+
+-- Concatenated searchable text: the ILIKE scan this replaces only
+-- covered title and key_findings; fold in the other descriptive
+-- columns so one GIN probe answers the whole search
+ALTER TABLE evidence
+ADD COLUMN IF NOT EXISTS tsv tsvector
+GENERATED ALWAYS AS (to_tsvector('english',
+    coalesce(title, '') || ' ' ||
+    coalesce(key_findings, '') || ' ' ||
+    coalesce(publisher, '') || ' ' ||
+    coalesce(author, '') || ' ' ||
+    coalesce(geographic_scope, '') || ' ' ||
+    coalesce(immutable_array_to_string(topic_tags, ' '), ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_evidence_tsv ON evidence USING GIN(tsv);
+
+-- Trigram index keeps partial/substring title matches indexed too
+CREATE INDEX IF NOT EXISTS idx_evidence_title_trgm ON evidence USING GIN(title gin_trgm_ops);
+
+-- Note: generated column backfills automatically; for large tables
+-- consider CREATE INDEX CONCURRENTLY in production